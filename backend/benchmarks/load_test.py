@@ -0,0 +1,324 @@
+"""
+Load Test - Concurrent dashboard clients against the REST API
+
+Starts the mock OpenF1 server and a uvicorn backend pointed at it, then
+runs many async clients that poll like the frontend dashboard. Results are
+written as JSON so runs can be compared between releases.
+
+Usage (from backend/):
+    python -m benchmarks.load_test --clients 200 --duration 60 --output bench.json
+    python -m benchmarks.load_test --url http://localhost:8000   # existing backend
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import aiohttp
+
+from mock_openf1.fixtures import SessionFixture, generate_race
+from mock_openf1.server import MockOpenF1, VirtualClock, start_server
+
+logger = logging.getLogger(__name__)
+
+# UPDATE_INTERVALS in frontend/src/utils/constants.ts
+FAST_DATA_INTERVAL = 5.0  # live telemetry/positions
+TIMING_DATA_INTERVAL = 15.0  # full refresh with timing data
+
+# Routes reported with their path parameters collapsed
+ROUTE_PATTERNS = [
+    (re.compile(r"^/api/sessions/current-or-latest$"), "/api/sessions/current-or-latest"),
+    (re.compile(r"^/api/([\w-]+)/[^/]+$"), "/api/{}/{{session_key}}"),
+]
+
+def route_name(path: str) -> str:
+    """Collapse a request path into its route template"""
+    path = path.split("?", 1)[0]
+    for pattern, template in ROUTE_PATTERNS:
+        match = pattern.match(path)
+        if match:
+            return template.format(*match.groups())
+    return path
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of sorted values"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+class LoadStats:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.not_modified: Dict[str, int] = {}
+        self.bytes_received = 0
+
+    def record(self, route: str, seconds: float, status: int, size: int):
+        self.latencies.setdefault(route, []).append(seconds)
+        self.bytes_received += size
+        if status == 304:
+            self.not_modified[route] = self.not_modified.get(route, 0) + 1
+        elif status >= 400:
+            self.errors[route] = self.errors.get(route, 0) + 1
+
+    def total_requests(self) -> int:
+        return sum(len(latencies) for latencies in self.latencies.values())
+
+    def routes(self) -> Dict[str, Dict]:
+        """Latency percentiles per route, in milliseconds"""
+        report = {}
+        for route, latencies in sorted(self.latencies.items()):
+            ordered = sorted(latencies)
+            report[route] = {
+                "requests": len(ordered),
+                "errors": self.errors.get(route, 0),
+                "not_modified": self.not_modified.get(route, 0),
+                "p50_ms": round(percentile(ordered, 0.50) * 1000, 2),
+                "p95_ms": round(percentile(ordered, 0.95) * 1000, 2),
+                "p99_ms": round(percentile(ordered, 0.99) * 1000, 2),
+                "mean_ms": round(sum(ordered) / len(ordered) * 1000, 2),
+                "max_ms": round(ordered[-1] * 1000, 2),
+            }
+        return report
+
+class DashboardClient:
+    """One browser tab: a full refresh every TIMING_DATA_INTERVAL and fast
+    data every FAST_DATA_INTERVAL, mirroring useF1Data's polling"""
+
+    def __init__(self, http: aiohttp.ClientSession, base_url: str, stats: LoadStats,
+                 interval_scale: float = 1.0, revalidate: bool = True):
+        self.http = http
+        self.base_url = base_url
+        self.stats = stats
+        self.interval_scale = interval_scale
+        self.revalidate = revalidate  # send If-None-Match like a browser cache
+        self.etags: Dict[str, str] = {}
+        self.session_key: Optional[str] = None
+
+    async def get(self, path: str) -> Optional[Dict]:
+        headers = {"Accept-Encoding": "gzip"}
+        if self.revalidate and path in self.etags:
+            headers["If-None-Match"] = self.etags[path]
+
+        started = time.perf_counter()
+        status, size, body = 599, 0, None
+        try:
+            async with self.http.get(self.base_url + path, headers=headers) as response:
+                raw = await response.read()
+                status, size = response.status, len(raw)
+                if response.headers.get("ETag"):
+                    self.etags[path] = response.headers["ETag"]
+                if status == 200 and path.startswith("/api/sessions"):
+                    body = json.loads(raw)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.debug(f"Request to {path} failed: {e}")
+        self.stats.record(route_name(path), time.perf_counter() - started, status, size)
+        return body
+
+    async def full_refresh(self):
+        """fetchData(): health, session, timing, then the rest in parallel"""
+        await self.get("/health")
+        session = await self.get("/api/sessions/current-or-latest")
+        if session and session.get("session"):
+            self.session_key = str(session["session"]["session_key"])
+        key = self.session_key or "latest"
+        await self.get(f"/api/live-timing/{key}")
+        await asyncio.gather(
+            self.get(f"/api/positions/{key}"),
+            self.get(f"/api/locations/{key}"),
+            self.get(f"/api/telemetry/{key}"),
+            self.get(f"/api/pit-stops/{key}"),
+            self.get(f"/api/pit-stops/{key}"),  # stints come from the same route
+        )
+
+    async def fast_refresh(self):
+        """fetchFastData() (telemetry, locations) plus positions, which FAST_DATA also covers"""
+        key = self.session_key or "latest"
+        await asyncio.gather(
+            self.get(f"/api/telemetry/{key}"),
+            self.get(f"/api/locations/{key}"),
+            self.get(f"/api/positions/{key}"),
+        )
+
+    async def run(self, until: float):
+        # Tabs are opened at different times
+        await asyncio.sleep(random.uniform(0, FAST_DATA_INTERVAL * self.interval_scale))
+        next_full = next_fast = time.monotonic()
+        while time.monotonic() < until:
+            now = time.monotonic()
+            if now >= next_full:
+                await self.full_refresh()
+                next_full = now + TIMING_DATA_INTERVAL * self.interval_scale
+                next_fast = now + FAST_DATA_INTERVAL * self.interval_scale
+            elif now >= next_fast:
+                await self.fast_refresh()
+                next_fast = now + FAST_DATA_INTERVAL * self.interval_scale
+            await asyncio.sleep(max(0.0, min(next_full, next_fast, until) - time.monotonic()))
+
+def peak_rss_mb(pid: int) -> Optional[float]:
+    """Peak resident set size of a process and its children (Linux /proc), in MB"""
+    total_kb = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f"/proc/{current}/status") as status_file:
+                for line in status_file:
+                    if line.startswith("VmHWM:"):
+                        total_kb += int(line.split()[1])
+            with open(f"/proc/{current}/task/{current}/children") as children_file:
+                pending += [int(child) for child in children_file.read().split()]
+        except (OSError, ValueError):
+            if current == pid:
+                return None
+    return round(total_kb / 1024, 1)
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+async def wait_until_ready(http: aiohttp.ClientSession, base_url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            async with http.get(base_url + "/") as response:
+                if response.status == 200:
+                    return
+        except aiohttp.ClientError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"Backend at {base_url} did not start")
+
+async def run_benchmark(args: argparse.Namespace) -> Dict:
+    mock = runner = backend = None
+    base_url = args.url
+    if not base_url:
+        fixture = SessionFixture(generate_race(laps=args.laps, seed=args.seed))
+        clock = VirtualClock(fixture.start, args.speed, args.start_offset) if args.speed > 0 else None
+        mock = MockOpenF1(fixture, clock, latency=args.upstream_latency, jitter=args.upstream_latency / 4,
+                          error_rate=args.error_rate, throttle_rate=args.throttle_rate, seed=args.seed)
+        runner = await start_server(mock, port=args.mock_port)
+
+        env = dict(os.environ, OPENF1_BASE_URL=f"http://127.0.0.1:{args.mock_port}/v1")
+        backend = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--port", str(args.port),
+             "--workers", str(args.workers), "--log-level", "warning"],
+            env=env, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            stdout=sys.stderr  # keep stdout for the report
+        )
+        base_url = f"http://127.0.0.1:{args.port}"
+
+    stats = LoadStats()
+    connector = aiohttp.TCPConnector(limit=0)
+    timeout = aiohttp.ClientTimeout(total=30)
+    try:
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as http:
+            await wait_until_ready(http, base_url)
+            upstream_before = mock.stats()["requests"] if mock else {}
+
+            started = time.monotonic()
+            until = started + args.duration
+            clients = [
+                DashboardClient(http, base_url, stats, args.interval_scale, not args.no_revalidate)
+                for _ in range(args.clients)
+            ]
+            await asyncio.gather(*(client.run(until) for client in clients))
+            elapsed = time.monotonic() - started
+
+            rss = peak_rss_mb(backend.pid) if backend else None
+            upstream = {}
+            if mock:
+                for endpoint, count in mock.stats()["requests"].items():
+                    upstream[endpoint] = count - upstream_before.get(endpoint, 0)
+    finally:
+        if backend:
+            backend.terminate()
+            backend.wait(timeout=10)
+        if runner:
+            await runner.cleanup()
+
+    requests = stats.total_requests()
+    upstream_calls = sum(upstream.values())
+    return {
+        "benchmark": "load_test",
+        "started_at": datetime.utcnow().isoformat(),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "config": {
+            "clients": args.clients,
+            "duration_s": args.duration,
+            "workers": args.workers,
+            "interval_scale": args.interval_scale,
+            "fast_interval_s": FAST_DATA_INTERVAL * args.interval_scale,
+            "timing_interval_s": TIMING_DATA_INTERVAL * args.interval_scale,
+            "revalidate": not args.no_revalidate,
+            "replay_speed": args.speed,
+            "upstream_latency_s": args.upstream_latency,
+            "upstream_error_rate": args.error_rate,
+            "upstream_throttle_rate": args.throttle_rate,
+            "target": args.url or "spawned",
+        },
+        "elapsed_s": round(elapsed, 2),
+        "requests": requests,
+        "errors": sum(stats.errors.values()),
+        "throughput_rps": round(requests / elapsed, 2) if elapsed else 0.0,
+        "bytes_received": stats.bytes_received,
+        "routes": stats.routes(),
+        "upstream": {
+            "calls": upstream_calls if mock else None,
+            "per_client_request": round(upstream_calls / requests, 4) if mock and requests else None,
+            "by_endpoint": upstream,
+        },
+        "backend_peak_rss_mb": rss,
+    }
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load test the F1 Dashboard API")
+    parser.add_argument("--clients", type=int, default=50, help="concurrent dashboard clients")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds to run")
+    parser.add_argument("--interval-scale", type=float, default=1.0,
+                        help="multiply the frontend polling intervals (e.g. 0.1 for a denser run)")
+    parser.add_argument("--no-revalidate", action="store_true", help="do not send If-None-Match")
+    parser.add_argument("--url", help="benchmark a running backend instead of spawning one")
+    parser.add_argument("--port", type=int, default=8010, help="port for the spawned backend")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the spawned backend")
+    parser.add_argument("--mock-port", type=int, default=8011, help="port for the mock OpenF1 server")
+    parser.add_argument("--laps", type=int, default=30, help="laps in the synthetic race")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed; 0 serves a completed session")
+    parser.add_argument("--start-offset", type=float, default=1200.0, help="seconds into the race to start")
+    parser.add_argument("--upstream-latency", type=float, default=0.15, help="mock OpenF1 mean latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="mock OpenF1 500 rate")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="mock OpenF1 429 rate")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    report = asyncio.run(run_benchmark(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(text + "\n")
+        logger.info(f"Wrote {args.output}")
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    main()
@@ -2,15 +2,27 @@
 Fixed F1 Dashboard Backend - Simplified and robust
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 import asyncio
 import logging
-from datetime import datetime
+import json
+import os
+import random
+import time
+from datetime import datetime, timedelta
 from typing import Optional
 import uvicorn
 
-from src.services.f1_service import F1Service
+from src.services import freshness
+from src.services.encoded_responses import EncodedResponseCache, etag_matches
+from src.services.f1_service import F1Service, OPENF1_BASE_URL, TIMING_ENDPOINTS, track_data_freshness
+from src.services.lap_statistics import format_cursor, parse_cursor
+from src.services.live_ingestor import LiveIngestor
+from src.services.metrics import CONTENT_TYPE, MetricsRegistry, counter, gauge
+from src.services.request_timing import format_server_timing, timed_stage, track_request_timing
+from src.services.shared_cache import create_shared_cache_from_env
 
 # Configure logging
 logging.basicConfig(
@@ -18,6 +30,11 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
+timing_logger = logging.getLogger("request_timing")
+
+# Fraction of requests timed per stage (Server-Timing header), and of those logged
+SERVER_TIMING_SAMPLE_RATE = float(os.getenv("F1_SERVER_TIMING_SAMPLE_RATE", "1.0"))
+TIMING_LOG_SAMPLE_RATE = float(os.getenv("F1_TIMING_LOG_SAMPLE_RATE", "0.0"))
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -33,22 +50,139 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Data-Age", "X-Data-Stale", "Server-Timing"],
 )
 
 # Initialize services
-f1_service = F1Service()
+metrics = MetricsRegistry()
+metrics.counter("f1_http_requests_total", "API requests by route, method and status")
+metrics.histogram("f1_http_request_duration_seconds", "API request latency by route")
+f1_service = F1Service(
+    metrics=metrics,
+    shared_cache=create_shared_cache_from_env(),
+    base_url=os.getenv("OPENF1_BASE_URL", OPENF1_BASE_URL)  # e.g. the local mock_openf1 server
+)
+encoded_responses = EncodedResponseCache()
+live_ingestor = LiveIngestor(f1_service)
+
+def collect_app_metrics() -> list:
+    """Report encoded-response cache and live ingestion state for /metrics"""
+    encoded = encoded_responses.stats()
+    ingestion = live_ingestor.stats()
+    return [
+        counter("f1_encoded_cache_hits_total", "Responses served from an already encoded body", encoded['hits']),
+        counter("f1_encoded_cache_misses_total", "Responses that had to be encoded", encoded['misses']),
+        gauge("f1_encoded_cache_entries", "Encoded response bodies held", encoded['entries']),
+        gauge("f1_live_ingestion_active", "Whether a live session is being ingested",
+              1 if ingestion['session_key'] else 0),
+        counter("f1_live_ingestion_polls_total", "Live ingestion endpoint refreshes", ingestion['polls']),
+        counter("f1_live_ingestion_errors_total", "Live ingestion failures", ingestion['errors']),
+    ]
+
+metrics.add_collector(collect_app_metrics)
+
+async def cached_json_response(request: Request, key: tuple, session_key: str, endpoints: tuple,
+                               fetch, build=lambda data: data) -> Response:
+    """Serve a JSON body encoded once per data version, with ETag/304 and gzip.
+
+    fetch() loads the data through the service; build(data) shapes the
+    payload and only runs when the data version changes. Error payloads
+    are returned as they are and never cached.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    
+    # Fresh data at a version already encoded: answer from its ETag alone
+    if if_none_match:
+        version = f1_service.peek_fresh_version(session_key, endpoints)
+        encoded = encoded_responses.peek(key, version) if version else None
+        if encoded is not None and etag_matches(if_none_match, encoded.etag):
+            return not_modified_response(encoded)
+    
+    data = await fetch()
+    if isinstance(data, dict) and data.get('error'):
+        return JSONResponse(data)
+    
+    version = f1_service.get_data_version(session_key, endpoints)
+    with timed_stage('encode'):
+        encoded = encoded_responses.get_or_encode(key, version, lambda: build(data))
+        if etag_matches(if_none_match, encoded.etag):
+            return not_modified_response(encoded)
+        
+        headers = {"ETag": encoded.etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if encoded.gzipped is not None and "gzip" in request.headers.get("accept-encoding", ""):
+            headers["Content-Encoding"] = "gzip"
+            return Response(content=encoded.gzipped, media_type="application/json", headers=headers)
+        return Response(content=encoded.body, media_type="application/json", headers=headers)
+
+def not_modified_response(encoded) -> Response:
+    """304 for a client that already holds this body"""
+    return Response(
+        status_code=304,
+        headers={"ETag": encoded.etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    )
+
+@app.middleware("http")
+async def add_data_freshness_headers(request: Request, call_next):
+    """Report the age of the upstream data behind each response"""
+    freshness = track_data_freshness()
+    response = await call_next(request)
+    response.headers["X-Data-Age"] = f"{freshness['age']:.1f}"
+    response.headers["X-Data-Stale"] = "true" if freshness['stale'] else "false"
+    return response
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Count requests and time them per route template"""
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        path = getattr(route, "path", "unmatched")
+        metrics.inc("f1_http_requests_total", route=path, method=request.method, status=str(status))
+        metrics.observe("f1_http_request_duration_seconds", time.perf_counter() - started, route=path)
+
+@app.middleware("http")
+async def add_server_timing(request: Request, call_next):
+    """Time sampled requests per stage and report them in Server-Timing"""
+    if random.random() >= SERVER_TIMING_SAMPLE_RATE:
+        return await call_next(request)
+    
+    timings = track_request_timing()
+    started = time.perf_counter()
+    response = await call_next(request)
+    total = time.perf_counter() - started
+    response.headers["Server-Timing"] = format_server_timing(timings, total)
+    
+    if TIMING_LOG_SAMPLE_RATE and random.random() < TIMING_LOG_SAMPLE_RATE:
+        route = request.scope.get("route")
+        timing_logger.info(json.dumps({
+            "method": request.method,
+            "path": request.url.path,
+            "route": getattr(route, "path", None),
+            "status": response.status_code,
+            "total_ms": round(total * 1000, 2),
+            "stages_ms": {stage: round(seconds * 1000, 2) for stage, seconds in timings.items()}
+        }))
+    return response
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize services on startup"""
     logger.info("🏎️  Starting F1 Dashboard API...")
     await f1_service.initialize()
+    if os.getenv("F1_LIVE_INGESTION", "1") != "0":
+        live_ingestor.start()
     logger.info("✅ F1 Dashboard API started successfully")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info("🛑 Shutting down F1 Dashboard API...")
+    await live_ingestor.stop()
     await f1_service.close()
     logger.info("✅ F1 Dashboard API shutdown complete")
 
@@ -78,10 +212,17 @@ async def health_check():
     return {
         "status": "healthy" if health['is_healthy'] else "degraded",
         "api_connection": api_status,
+        "circuit_breakers": health['circuit_breakers'],
+        "live_ingestion": live_ingestor.stats(),
         "service_health": health,
         "timestamp": datetime.utcnow().isoformat()
     }
 
+@app.get("/metrics")
+async def get_metrics():
+    """Metrics in Prometheus text exposition format"""
+    return Response(metrics.render(), media_type=CONTENT_TYPE)
+
 @app.get("/api/sessions/current-or-latest")
 async def get_current_or_latest_session():
     """Get current live session or fallback to latest completed session"""
@@ -95,32 +236,10 @@ async def get_current_or_latest_session():
                 "is_live": False
             }
         
-        # Check if session is live - fix timezone comparison
-        from datetime import timezone
-        now = datetime.now(timezone.utc)
-        
-        # Parse dates and ensure they have timezone info
-        start_str = session['date_start']
-        end_str = session['date_end']
-        
-        # Handle different date formats from API
-        if start_str.endswith('Z'):
-            start_time = datetime.fromisoformat(start_str.replace('Z', '+00:00'))
-        elif '+' in start_str or start_str.endswith('00'):
-            start_time = datetime.fromisoformat(start_str)
-        else:
-            start_time = datetime.fromisoformat(start_str + '+00:00')
-            
-        if end_str.endswith('Z'):
-            end_time = datetime.fromisoformat(end_str.replace('Z', '+00:00'))
-        elif '+' in end_str or end_str.endswith('00'):
-            end_time = datetime.fromisoformat(end_str)
-        else:
-            end_time = datetime.fromisoformat(end_str + '+00:00')
-        
-        is_live = start_time <= now <= end_time
-        is_upcoming = start_time > now
-        is_completed = end_time < now
+        state = freshness.get_session_state(session, grace=timedelta(0))
+        is_live = state == freshness.LIVE
+        is_upcoming = state == freshness.UPCOMING
+        is_completed = state == freshness.COMPLETED
         
         if is_live:
             message = "Current live session"
@@ -166,7 +285,7 @@ async def get_session_by_key(session_key: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/drivers/{session_key}")
-async def get_drivers(session_key: str):
+async def get_drivers(session_key: str, request: Request):
     """Get drivers for a session"""
     try:
         # Handle 'latest' session key
@@ -176,15 +295,18 @@ async def get_drivers(session_key: str):
                 return {"drivers": []}
             session_key = str(session['session_key'])
         
-        drivers = await f1_service.get_drivers(session_key)
-        return {"drivers": drivers}
+        return await cached_json_response(
+            request, ("drivers", session_key), session_key, ("drivers",),
+            lambda: f1_service.get_drivers(session_key),
+            lambda drivers: {"drivers": drivers}
+        )
         
     except Exception as e:
         logger.error(f"Error getting drivers: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/live-timing/{session_key}")
-async def get_live_timing(session_key: str):
+async def get_live_timing(session_key: str, request: Request):
     """Get comprehensive live timing data"""
     try:
         # Handle 'latest' session key
@@ -197,8 +319,10 @@ async def get_live_timing(session_key: str):
                 }
             session_key = str(session['session_key'])
         
-        timing_data = await f1_service.get_comprehensive_timing_data(session_key)
-        return timing_data
+        return await cached_json_response(
+            request, ("live-timing", session_key), session_key, TIMING_ENDPOINTS,
+            lambda: f1_service.get_comprehensive_timing_data(session_key)
+        )
         
     except Exception as e:
         logger.error(f"Error getting live timing: {e}")
@@ -208,7 +332,7 @@ async def get_live_timing(session_key: str):
         }
 
 @app.get("/api/positions/{session_key}")
-async def get_positions(session_key: str):
+async def get_positions(session_key: str, request: Request):
     """Get current positions"""
     try:
         if session_key == "latest":
@@ -217,15 +341,18 @@ async def get_positions(session_key: str):
                 return {"positions": []}
             session_key = str(session['session_key'])
         
-        positions = await f1_service.get_positions(session_key)
-        return {"positions": positions}
+        return await cached_json_response(
+            request, ("positions", session_key), session_key, ("position",),
+            lambda: f1_service.sync_dataset("position", session_key),
+            lambda positions: {"positions": positions.rows}
+        )
         
     except Exception as e:
         logger.error(f"Error getting positions: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/locations/{session_key}")
-async def get_locations(session_key: str):
+async def get_locations(session_key: str, request: Request):
     """Get car locations"""
     try:
         if session_key == "latest":
@@ -234,8 +361,11 @@ async def get_locations(session_key: str):
                 return {"locations": []}
             session_key = str(session['session_key'])
         
-        locations = await f1_service.get_locations(session_key)
-        return {"locations": locations}
+        return await cached_json_response(
+            request, ("locations", session_key), session_key, ("location",),
+            lambda: f1_service.get_locations(session_key),
+            lambda locations: {"locations": locations}
+        )
         
     except Exception as e:
         logger.error(f"Error getting locations: {e}")
@@ -258,8 +388,39 @@ async def get_telemetry(session_key: str, driver_number: Optional[int] = None):
         logger.error(f"Error getting telemetry: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/laps/{session_key}")
+async def get_laps(session_key: str, request: Request, driver_number: Optional[int] = None,
+                   lap_from: Optional[int] = None, lap_to: Optional[int] = None,
+                   cursor: Optional[str] = None, limit: int = Query(100, ge=1, le=1000)):
+    """Get lap history with per-driver and session statistics"""
+    try:
+        after = parse_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {cursor}")
+    
+    try:
+        if session_key == "latest":
+            session = await f1_service.get_current_session()
+            if not session:
+                return {"laps": [], "nextCursor": None, "statistics": None}
+            session_key = str(session['session_key'])
+        
+        return await cached_json_response(
+            request, ("laps", session_key, driver_number, lap_from, lap_to, after, limit), session_key, ("laps",),
+            lambda: f1_service.get_lap_history(session_key, driver_number, lap_from, lap_to, after, limit),
+            lambda history: {
+                "laps": history["laps"],
+                "nextCursor": format_cursor(history["next"]) if history["next"] else None,
+                "statistics": history["statistics"]
+            }
+        )
+        
+    except Exception as e:
+        logger.error(f"Error getting laps: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/api/pit-stops/{session_key}")
-async def get_pit_stops(session_key: str):
+async def get_pit_stops(session_key: str, request: Request):
     """Get pit stop data"""
     try:
         if session_key == "latest":
@@ -268,20 +429,55 @@ async def get_pit_stops(session_key: str):
                 return {"pit_stops": [], "stints": []}
             session_key = str(session['session_key'])
         
-        pit_data = await f1_service.get_pit_data(session_key)
-        stints = await f1_service.get_stints(session_key)
-        
-        return {
-            "pit_stops": pit_data,
-            "stints": stints
-        }
+        return await cached_json_response(
+            request, ("pit-stops", session_key), session_key, ("pit", "stints"),
+            lambda: f1_service.fetch_concurrently(
+                f1_service.get_pit_data(session_key),
+                f1_service.get_stints(session_key),
+            ),
+            lambda data: {
+                "pit_stops": data[0],
+                "stints": data[1]
+            }
+        )
         
     except Exception as e:
         logger.error(f"Error getting pit stops: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def build_circuit_data(locations: list) -> dict:
+    """Process car locations into track points and bounds"""
+    track_points = []
+    seen_points = set()
+    
+    for location in locations:
+        x, y = location.get('x'), location.get('y')
+        if x is not None and y is not None:
+            point = (round(x, 1), round(y, 1))  # Round to reduce duplicates
+            if point not in seen_points:
+                track_points.append({'x': x, 'y': y})
+                seen_points.add(point)
+    
+    # Calculate bounds
+    bounds = None
+    if track_points:
+        x_coords = [p['x'] for p in track_points]
+        y_coords = [p['y'] for p in track_points]
+        bounds = {
+            'minX': min(x_coords),
+            'maxX': max(x_coords),
+            'minY': min(y_coords),
+            'maxY': max(y_coords)
+        }
+    
+    return {
+        "trackPoints": track_points,
+        "bounds": bounds,
+        "pointCount": len(track_points)
+    }
+
 @app.get("/api/circuit/{session_key}")
-async def get_circuit_data(session_key: str):
+async def get_circuit_data(session_key: str, request: Request):
     """Get circuit visualization data"""
     try:
         if session_key == "latest":
@@ -290,37 +486,11 @@ async def get_circuit_data(session_key: str):
                 return {"trackPoints": [], "bounds": None}
             session_key = str(session['session_key'])
         
-        locations = await f1_service.get_locations(session_key)
-        
-        # Process locations into track points
-        track_points = []
-        seen_points = set()
-        
-        for location in locations:
-            x, y = location.get('x'), location.get('y')
-            if x is not None and y is not None:
-                point = (round(x, 1), round(y, 1))  # Round to reduce duplicates
-                if point not in seen_points:
-                    track_points.append({'x': x, 'y': y})
-                    seen_points.add(point)
-        
-        # Calculate bounds
-        bounds = None
-        if track_points:
-            x_coords = [p['x'] for p in track_points]
-            y_coords = [p['y'] for p in track_points]
-            bounds = {
-                'minX': min(x_coords),
-                'maxX': max(x_coords),
-                'minY': min(y_coords),
-                'maxY': max(y_coords)
-            }
-        
-        return {
-            "trackPoints": track_points,
-            "bounds": bounds,
-            "pointCount": len(track_points)
-        }
+        return await cached_json_response(
+            request, ("circuit", session_key), session_key, ("location",),
+            lambda: f1_service.get_locations(session_key),
+            build_circuit_data
+        )
         
     except Exception as e:
         logger.error(f"Error getting circuit data: {e}")
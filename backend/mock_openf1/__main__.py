@@ -0,0 +1,63 @@
+"""
+Mock OpenF1 CLI - Run the local OpenF1 stand-in
+
+Usage (from backend/):
+    python -m mock_openf1 --speed 10
+    OPENF1_BASE_URL=http://127.0.0.1:8001/v1 uvicorn main:app
+"""
+
+import argparse
+import asyncio
+import logging
+
+from mock_openf1.fixtures import SessionFixture, generate_race, load_fixture
+from mock_openf1.server import MockOpenF1, VirtualClock, start_server
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve OpenF1 session fixtures locally")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--fixture", help="fixture directory (default: generate a synthetic race)")
+    parser.add_argument("--laps", type=int, default=30, help="laps in a synthetic race")
+    parser.add_argument("--drivers", type=int, default=20, help="drivers in a synthetic race")
+    parser.add_argument("--location-hz", type=float, default=1.0, help="synthetic location samples per second")
+    parser.add_argument("--car-data-hz", type=float, default=1.0, help="synthetic car_data samples per second")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--speed", type=float, default=0.0,
+                        help="replay the session live at this multiple of real time (0 serves it completed)")
+    parser.add_argument("--start-offset", type=float, default=-30.0,
+                        help="seconds into the session the replay starts at")
+    parser.add_argument("--latency", type=float, default=0.0, help="mean seconds added to each response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="standard deviation of the added latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 500")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429s")
+    return parser.parse_args()
+
+async def main():
+    args = parse_args()
+    if args.fixture:
+        fixture = load_fixture(args.fixture)
+    else:
+        fixture = SessionFixture(generate_race(
+            laps=args.laps, drivers=args.drivers, location_hz=args.location_hz,
+            car_data_hz=args.car_data_hz, seed=args.seed
+        ))
+
+    clock = VirtualClock(fixture.start, args.speed, args.start_offset) if args.speed > 0 else None
+    mock = MockOpenF1(
+        fixture, clock, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate, retry_after=args.retry_after, seed=args.seed
+    )
+    runner = await start_server(mock, args.host, args.port)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
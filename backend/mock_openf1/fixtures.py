@@ -0,0 +1,384 @@
+"""
+Fixtures - Recorded or synthetic OpenF1 session data for the mock server
+"""
+
+import bisect
+import json
+import logging
+import math
+import os
+import random
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.utils.helpers import parse_api_datetime
+
+logger = logging.getLogger(__name__)
+
+# Endpoints a fixture holds, one JSON file each
+FIXTURE_ENDPOINTS = (
+    "sessions", "meetings", "drivers", "position", "intervals",
+    "laps", "stints", "pit", "location", "car_data",
+)
+
+# Date fields that are compared as times and rebased when replaying
+DATE_FIELDS = ("date", "date_start", "date_end")
+
+def parse_epoch(value: Any) -> Optional[float]:
+    """Parse an OpenF1 date into epoch seconds"""
+    parsed = parse_api_datetime(value) if isinstance(value, str) else None
+    return parsed.timestamp() if parsed else None
+
+def format_epoch(seconds: float) -> str:
+    """Format epoch seconds the way OpenF1 does"""
+    return datetime.fromtimestamp(seconds, timezone.utc).isoformat()
+
+class FixtureTable:
+    """Rows of one endpoint, ordered by the time they become visible.
+
+    Each row keeps the epoch of its date fields so filters and replay
+    rebasing never re-parse strings; driver_number lookups use an index.
+    """
+
+    def __init__(self, endpoint: str, rows: List[Dict], visible_at: List[float]):
+        order = sorted(range(len(rows)), key=lambda i: visible_at[i])
+        self.endpoint = endpoint
+        self.rows = [rows[i] for i in order]
+        self.visible_at = [visible_at[i] for i in order]
+        self.epochs = [
+            {field: parse_epoch(row[field]) for field in DATE_FIELDS if row.get(field) is not None}
+            for row in self.rows
+        ]
+        self.by_driver: Dict[int, List[int]] = {}
+        for index, row in enumerate(self.rows):
+            self.by_driver.setdefault(row.get("driver_number"), []).append(index)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def visible_count(self, until: Optional[float]) -> int:
+        """How many rows are visible at a fixture time; None means all"""
+        if until is None:
+            return len(self.rows)
+        return bisect.bisect_right(self.visible_at, until)
+
+    def query(self, filters: List[Tuple[str, str, Any]], until: Optional[float] = None) -> List[int]:
+        """Get indexes of visible rows matching every (field, operator, value) filter"""
+        limit = self.visible_count(until)
+        driver_filter = next((value for field, op, value in filters
+                              if field == "driver_number" and op == "="), None)
+        if driver_filter is not None:
+            candidates = self.by_driver.get(_coerce_number(driver_filter), [])
+            end = bisect.bisect_left(candidates, limit)
+            indexes = candidates[:end]
+        else:
+            indexes = range(limit)
+
+        checks = [(field, op, _comparable(field, value)) for field, op, value in filters]
+        return [index for index in indexes if self._matches(index, checks)]
+
+    def _matches(self, index: int, checks: List[Tuple[str, str, Any]]) -> bool:
+        row = self.rows[index]
+        epochs = self.epochs[index]
+        for field, op, expected in checks:
+            actual = epochs.get(field) if field in DATE_FIELDS else row.get(field)
+            if actual is None or expected is None:
+                return False
+            if isinstance(expected, float) and not isinstance(actual, (int, float)):
+                return False
+            if isinstance(expected, str):
+                actual = str(actual).lower() if isinstance(actual, bool) else str(actual)
+            if op == "=" and actual != expected:
+                return False
+            if op == ">=" and not actual >= expected:
+                return False
+            if op == "<=" and not actual <= expected:
+                return False
+            if op == ">" and not actual > expected:
+                return False
+            if op == "<" and not actual < expected:
+                return False
+        return True
+
+def _coerce_number(value: Any) -> Any:
+    """Turn a numeric query value into a number"""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return value
+    return int(number) if number.is_integer() else number
+
+def _comparable(field: str, value: Any) -> Any:
+    """Turn a query value into what the field compares against"""
+    if field in DATE_FIELDS:
+        return value if isinstance(value, float) else parse_epoch(value)
+    number = _coerce_number(value)
+    if isinstance(number, (int, float)) and not isinstance(number, bool):
+        return float(number)
+    return number
+
+def parse_filter(key: str, value: str) -> Tuple[str, str, str]:
+    """Split a query pair into (field, operator, value).
+
+    OpenF1 accepts both `date>=X` (key "date>", value "X" once parsed),
+    `date>X` (key "date>X", no value) and the encoded form the backend
+    sends, `date=>=X`.
+    """
+    if value[:2] in (">=", "<="):
+        return key, value[:2], value[2:]
+    if value[:1] in (">", "<"):
+        return key, value[:1], value[1:]
+    if key.endswith(">") or key.endswith("<"):
+        return key[:-1], key[-1] + "=", value
+    if not value:
+        for op in (">", "<"):
+            field, found, operand = key.partition(op)
+            if found:
+                return field, op, operand
+    return key, "=", value
+
+class SessionFixture:
+    """All endpoints of one recorded or generated session"""
+
+    def __init__(self, data: Dict[str, List[Dict]]):
+        self.session = data["sessions"][0]
+        self.session_key = self.session["session_key"]
+        self.meeting_key = self.session.get("meeting_key")
+        self.start = parse_epoch(self.session.get("date_start"))
+        self.end = parse_epoch(self.session.get("date_end"))
+        self.tables = {
+            endpoint: FixtureTable(endpoint, rows, self._visible_at(endpoint, rows, data))
+            for endpoint, rows in data.items()
+        }
+
+    def _visible_at(self, endpoint: str, rows: List[Dict], data: Dict[str, List[Dict]]) -> List[float]:
+        """When each row would have appeared on the live feed"""
+        if endpoint == "laps":
+            # A lap is published once it is complete
+            return [(parse_epoch(row.get("date_start")) or self.start) + (row.get("lap_duration") or 0.0)
+                    for row in rows]
+        if endpoint == "stints":
+            # A stint appears when its first lap starts
+            lap_starts = {
+                (lap.get("driver_number"), lap.get("lap_number")): parse_epoch(lap.get("date_start"))
+                for lap in data.get("laps", [])
+            }
+            return [lap_starts.get((row.get("driver_number"), row.get("lap_start"))) or self.start
+                    for row in rows]
+        if endpoint in ("sessions", "meetings", "drivers"):
+            return [float("-inf")] * len(rows)
+        return [parse_epoch(row.get("date")) or self.start for row in rows]
+
+def load_fixture(directory: str) -> SessionFixture:
+    """Load a fixture directory written by save_fixture() or the recorder"""
+    data = {}
+    for endpoint in FIXTURE_ENDPOINTS:
+        path = os.path.join(directory, f"{endpoint}.json")
+        if os.path.exists(path):
+            with open(path) as fixture_file:
+                data[endpoint] = json.load(fixture_file)
+    if not data.get("sessions"):
+        raise ValueError(f"Fixture {directory} has no sessions.json")
+    logger.info(f"Loaded fixture {directory}: " +
+                ", ".join(f"{endpoint}={len(rows)}" for endpoint, rows in data.items()))
+    return SessionFixture(data)
+
+def save_fixture(data: Dict[str, List[Dict]], directory: str):
+    """Write one JSON file per endpoint"""
+    os.makedirs(directory, exist_ok=True)
+    for endpoint, rows in data.items():
+        with open(os.path.join(directory, f"{endpoint}.json"), "w") as fixture_file:
+            json.dump(rows, fixture_file)
+
+# Grid used by generated fixtures: number, acronym, name, team, colour
+SYNTHETIC_GRID = [
+    (1, "VER", "Max VERSTAPPEN", "Red Bull Racing", "3671C6"),
+    (11, "PER", "Sergio PEREZ", "Red Bull Racing", "3671C6"),
+    (16, "LEC", "Charles LECLERC", "Ferrari", "E8002D"),
+    (55, "SAI", "Carlos SAINZ", "Ferrari", "E8002D"),
+    (44, "HAM", "Lewis HAMILTON", "Mercedes", "27F4D2"),
+    (63, "RUS", "George RUSSELL", "Mercedes", "27F4D2"),
+    (4, "NOR", "Lando NORRIS", "McLaren", "FF8000"),
+    (81, "PIA", "Oscar PIASTRI", "McLaren", "FF8000"),
+    (14, "ALO", "Fernando ALONSO", "Aston Martin", "229971"),
+    (18, "STR", "Lance STROLL", "Aston Martin", "229971"),
+    (10, "GAS", "Pierre GASLY", "Alpine", "FF87BC"),
+    (31, "OCO", "Esteban OCON", "Alpine", "FF87BC"),
+    (23, "ALB", "Alexander ALBON", "Williams", "64C4FF"),
+    (2, "SAR", "Logan SARGEANT", "Williams", "64C4FF"),
+    (22, "TSU", "Yuki TSUNODA", "RB", "6692FF"),
+    (3, "RIC", "Daniel RICCIARDO", "RB", "6692FF"),
+    (77, "BOT", "Valtteri BOTTAS", "Kick Sauber", "52E252"),
+    (24, "ZHO", "Zhou GUANYU", "Kick Sauber", "52E252"),
+    (20, "MAG", "Kevin MAGNUSSEN", "Haas F1 Team", "B6BABD"),
+    (27, "HUL", "Nico HULKENBERG", "Haas F1 Team", "B6BABD"),
+]
+
+def generate_race(laps: int = 30, drivers: int = 20, location_hz: float = 1.0,
+                  car_data_hz: float = 1.0, seed: int = 1,
+                  session_key: int = 9999, meeting_key: int = 1999,
+                  date_start: str = "2024-03-02T15:00:00+00:00") -> Dict[str, List[Dict]]:
+    """Generate a plausible race with the shape of OpenF1 data.
+
+    Lap times, one pit stop per driver, positions, intervals, stints and
+    telemetry are derived from per-driver pace, so the data is consistent
+    with itself. The same seed always gives the same race.
+    """
+    rng = random.Random(seed)
+    start = parse_api_datetime(date_start)
+    t0 = start.timestamp()
+    grid = SYNTHETIC_GRID[:drivers]
+    base_lap = 92.0
+    sector_split = (0.31, 0.37, 0.32)
+
+    def iso(seconds: float) -> str:
+        return format_epoch(seconds)
+
+    def base(number: int) -> Dict:
+        return {"session_key": session_key, "meeting_key": meeting_key, "driver_number": number}
+
+    rows: Dict[str, List[Dict]] = {endpoint: [] for endpoint in FIXTURE_ENDPOINTS}
+
+    # Lap timeline: per driver, start time of every lap
+    lap_starts: Dict[int, List[float]] = {}
+    pit_laps: Dict[int, int] = {}
+    for grid_slot, (number, *_rest) in enumerate(grid):
+        pace = base_lap + grid_slot * 0.08 + rng.uniform(0, 0.4)
+        pit_lap = max(2, min(laps - 1, laps // 2 + rng.randint(-4, 4)))
+        pit_laps[number] = pit_lap
+        now = t0 + grid_slot * 0.25  # staggered start
+        starts = []
+        for lap_number in range(1, laps + 1):
+            starts.append(now)
+            duration = pace + rng.gauss(0, 0.35) - lap_number * 0.02
+            if lap_number == 1:
+                duration += 6.0
+            if lap_number == pit_lap:
+                duration += 21.0
+            segments = [[rng.choice((2048, 2048, 2049, 2051)) for _ in range(count)] for count in (8, 9, 8)]
+            sectors = [round(duration * split, 3) for split in sector_split]
+            rows["laps"].append({
+                **base(number),
+                "lap_number": lap_number,
+                "date_start": iso(now),
+                "lap_duration": round(sum(sectors), 3),
+                "duration_sector_1": sectors[0],
+                "duration_sector_2": sectors[1],
+                "duration_sector_3": sectors[2],
+                "i1_speed": rng.randint(280, 310),
+                "i2_speed": rng.randint(250, 285),
+                "st_speed": rng.randint(300, 330),
+                "is_pit_out_lap": lap_number == pit_lap + 1,
+                "segments_sector_1": segments[0],
+                "segments_sector_2": segments[1],
+                "segments_sector_3": segments[2],
+            })
+            if lap_number == pit_lap:
+                rows["pit"].append({
+                    **base(number),
+                    "lap_number": lap_number,
+                    "date": iso(now + duration - 12.0),
+                    "pit_duration": round(21.0 + rng.uniform(0.5, 3.0), 1),
+                })
+            now += sum(sectors)
+        starts.append(now)  # chequered flag
+        lap_starts[number] = starts
+
+    date_end = max(starts[-1] for starts in lap_starts.values()) + 60
+
+    rows["sessions"].append({
+        "session_key": session_key, "meeting_key": meeting_key,
+        "session_name": "Race", "session_type": "Race",
+        "date_start": iso(t0), "date_end": iso(date_end),
+        "circuit_short_name": "Sakhir", "country_name": "Bahrain", "location": "Sakhir",
+        "year": start.year, "gmt_offset": "03:00:00",
+    })
+    rows["meetings"].append({
+        "meeting_key": meeting_key, "meeting_name": "Bahrain Grand Prix",
+        "circuit_short_name": "Sakhir", "country_name": "Bahrain",
+        "date_start": iso(t0), "year": start.year,
+    })
+    for number, acronym, name, team, colour in grid:
+        first, _, last = name.partition(" ")
+        rows["drivers"].append({
+            **base(number),
+            "broadcast_name": f"{first[0]} {last}", "full_name": name,
+            "name_acronym": acronym, "team_name": team, "team_colour": colour,
+            "first_name": first, "last_name": last.title(), "country_code": None,
+            "headshot_url": None,
+        })
+        pit_lap = pit_laps[number]
+        rows["stints"].append({**base(number), "stint_number": 1, "compound": "MEDIUM",
+                               "lap_start": 1, "lap_end": pit_lap, "tyre_age_at_start": 0})
+        rows["stints"].append({**base(number), "stint_number": 2, "compound": "HARD",
+                               "lap_start": pit_lap + 1, "lap_end": laps, "tyre_age_at_start": 0})
+
+    def progress(number: int, at: float) -> float:
+        """Laps completed (fractional) by a driver at a time"""
+        starts = lap_starts[number]
+        index = bisect.bisect_right(starts, at) - 1
+        if index < 0:
+            return 0.0
+        if index >= len(starts) - 1:
+            return float(laps)
+        return index + (at - starts[index]) / (starts[index + 1] - starts[index])
+
+    def time_at(number: int, distance: float) -> float:
+        """When a driver reached a (fractional) lap distance"""
+        starts = lap_starts[number]
+        index = min(int(distance), len(starts) - 2)
+        return starts[index] + (distance - index) * (starts[index + 1] - starts[index])
+
+    # Positions and intervals sampled every 4 seconds, like the live feed
+    last_positions: Dict[int, int] = {}
+    at = t0
+    while at <= date_end:
+        distances = {number: progress(number, at) for number, *_rest in grid}
+        order = sorted(distances, key=lambda number: (-distances[number], number))
+        leader = order[0]
+        for place, number in enumerate(order, start=1):
+            if last_positions.get(number) != place:
+                last_positions[number] = place
+                rows["position"].append({**base(number), "date": iso(at), "position": place})
+            if at > t0 + 60:
+                # Gaps are how much later a driver reached the distance they are at now
+                reached = time_at(number, distances[number])
+                ahead = order[place - 2] if place > 1 else None
+                rows["intervals"].append({
+                    **base(number), "date": iso(at),
+                    "gap_to_leader": round(max(0.0, reached - time_at(leader, distances[number])), 3)
+                    if ahead else None,
+                    "interval": round(max(0.0, reached - time_at(ahead, distances[number])), 3)
+                    if ahead else None,
+                })
+        at += 4.0
+
+    # Telemetry: a lap is one loop of an ellipse; speed follows the curvature
+    def add_samples(endpoint: str, hz: float, make_row):
+        if hz <= 0:
+            return
+        step = 1.0 / hz
+        for number, *_rest in grid:
+            at = lap_starts[number][0]
+            finish = lap_starts[number][-1]
+            while at <= finish:
+                fraction = progress(number, at) % 1.0
+                rows[endpoint].append({**base(number), "date": iso(at), **make_row(fraction)})
+                at += step
+
+    def location_row(fraction: float) -> Dict:
+        angle = fraction * 2 * math.pi
+        return {"x": round(4200 * math.cos(angle)), "y": round(2600 * math.sin(angle)), "z": 120}
+
+    def car_data_row(fraction: float) -> Dict:
+        corner = abs(math.sin(fraction * 10 * math.pi))
+        speed = round(310 - 200 * corner ** 4)
+        braking = corner > 0.95
+        return {
+            "speed": speed, "rpm": 7000 + speed * 15, "n_gear": min(8, 2 + speed // 45),
+            "throttle": 0 if braking else 100, "brake": 100 if braking else 0, "drs": 0,
+        }
+
+    add_samples("location", location_hz, location_row)
+    add_samples("car_data", car_data_hz, car_data_row)
+    return rows
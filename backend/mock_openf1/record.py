@@ -0,0 +1,75 @@
+"""
+Fixture Recorder - Save a real OpenF1 session as a mock server fixture
+
+Usage (from backend/):
+    python -m mock_openf1.record 9158 fixtures/9158 [--skip-telemetry]
+"""
+
+import argparse
+import asyncio
+import logging
+from typing import Dict, List
+
+import aiohttp
+
+from mock_openf1.fixtures import save_fixture
+
+logger = logging.getLogger(__name__)
+
+OPENF1_URL = "https://api.openf1.org/v1"
+
+# Endpoints fetched for the whole session in one request
+SESSION_ENDPOINTS = ("sessions", "drivers", "position", "intervals", "laps", "stints", "pit")
+
+# Telemetry is too large for one request, so it is fetched per driver
+TELEMETRY_ENDPOINTS = ("location", "car_data")
+
+# Pause between requests to stay inside OpenF1's rate limit
+REQUEST_INTERVAL = 0.5
+
+async def fetch(session: aiohttp.ClientSession, endpoint: str, params: Dict) -> List[Dict]:
+    """Fetch one endpoint, waiting out 429s"""
+    while True:
+        async with session.get(f"{OPENF1_URL}/{endpoint}", params=params) as response:
+            if response.status == 429:
+                await asyncio.sleep(float(response.headers.get("Retry-After", 5)))
+                continue
+            response.raise_for_status()
+            await asyncio.sleep(REQUEST_INTERVAL)
+            return await response.json()
+
+async def record(session_key: str, directory: str, skip_telemetry: bool = False):
+    data: Dict[str, List[Dict]] = {}
+    timeout = aiohttp.ClientTimeout(total=300)
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        for endpoint in SESSION_ENDPOINTS:
+            data[endpoint] = await fetch(session, endpoint, {"session_key": session_key})
+            logger.info(f"Recorded {len(data[endpoint])} {endpoint} rows")
+
+        meeting_key = data["sessions"][0].get("meeting_key") if data["sessions"] else None
+        if meeting_key is not None:
+            data["meetings"] = await fetch(session, "meetings", {"meeting_key": meeting_key})
+
+        if not skip_telemetry:
+            for endpoint in TELEMETRY_ENDPOINTS:
+                data[endpoint] = []
+                for driver in data["drivers"]:
+                    data[endpoint] += await fetch(session, endpoint, {
+                        "session_key": session_key, "driver_number": driver["driver_number"]
+                    })
+                logger.info(f"Recorded {len(data[endpoint])} {endpoint} rows")
+
+    save_fixture(data, directory)
+    logger.info(f"Saved fixture for session {session_key} to {directory}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Record an OpenF1 session as a fixture")
+    parser.add_argument("session_key")
+    parser.add_argument("directory")
+    parser.add_argument("--skip-telemetry", action="store_true", help="skip location and car_data")
+    args = parser.parse_args()
+    asyncio.run(record(args.session_key, args.directory, args.skip_telemetry))
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    main()
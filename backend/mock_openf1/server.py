@@ -0,0 +1,178 @@
+"""
+Mock OpenF1 - Local stand-in for api.openf1.org serving session fixtures
+"""
+
+import asyncio
+import json
+import logging
+import random
+import time
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+from mock_openf1.fixtures import DATE_FIELDS, SessionFixture, parse_epoch, format_epoch, parse_filter
+
+logger = logging.getLogger(__name__)
+
+# Settings that can be changed at runtime through POST /_mock/config
+INJECTION_SETTINGS = ("latency", "jitter", "error_rate", "throttle_rate", "retry_after")
+
+class VirtualClock:
+    """Maps wall-clock time onto fixture time, replaying at `speed`× real time.
+
+    Replays start `offset` seconds into the session (negative for before
+    the start). Served dates are rebased onto the wall clock, so the
+    session looks live to the backend, and date filters are mapped back.
+    """
+
+    def __init__(self, fixture_start: float, speed: float = 1.0, offset: float = 0.0):
+        self.speed = speed
+        self.origin = fixture_start + offset
+        self.wall_start = time.time()
+
+    def now(self) -> float:
+        """Current fixture time"""
+        return self.to_fixture(time.time())
+
+    def to_fixture(self, wall_time: float) -> float:
+        return self.origin + (wall_time - self.wall_start) * self.speed
+
+    def to_wall(self, fixture_time: float) -> float:
+        return self.wall_start + (fixture_time - self.origin) / self.speed
+
+class MockOpenF1:
+    def __init__(self, fixture: SessionFixture, clock: Optional[VirtualClock] = None,
+                 latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 throttle_rate: float = 0.0, retry_after: float = 1.0, seed: Optional[int] = None):
+        self.fixture = fixture
+        self.clock = clock
+        self.latency = latency  # mean seconds added to every response
+        self.jitter = jitter  # standard deviation of the added latency
+        self.error_rate = error_rate  # fraction of requests answered with 500
+        self.throttle_rate = throttle_rate  # fraction of requests answered with 429
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+
+        # Metrics
+        self.requests: Dict[str, int] = {}
+        self.errors = 0
+        self.throttled = 0
+        self.rows_served = 0
+        self.bytes_served = 0
+
+    def create_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/v1/{endpoint}", self.handle)
+        app.router.add_get("/_mock/stats", self.handle_stats)
+        app.router.add_post("/_mock/config", self.handle_config)
+        return app
+
+    async def handle(self, request: web.Request) -> web.Response:
+        """Answer an OpenF1 query from the fixture"""
+        endpoint = request.match_info["endpoint"]
+        self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+
+        delay = self._random.gauss(self.latency, self.jitter) if self.jitter else self.latency
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        roll = self._random.random()
+        if roll < self.throttle_rate:
+            self.throttled += 1
+            return web.json_response({"detail": "Too Many Requests"}, status=429,
+                                     headers={"Retry-After": str(self.retry_after)})
+        if roll < self.throttle_rate + self.error_rate:
+            self.errors += 1
+            return web.json_response({"detail": "Internal Server Error"}, status=500)
+
+        table = self.fixture.tables.get(endpoint)
+        if table is None:
+            return web.json_response({"detail": "Not Found"}, status=404)
+
+        filters = self._parse_filters(request)
+        if filters is None:
+            body = b"[]"
+        else:
+            until = self.clock.now() if self.clock else None
+            indexes = table.query(filters, until)
+            rows = [self._serve_row(table, index) for index in indexes]
+            self.rows_served += len(rows)
+            body = json.dumps(rows).encode("utf-8")
+
+        self.bytes_served += len(body)
+        return web.Response(body=body, content_type="application/json")
+
+    def _parse_filters(self, request: web.Request) -> Optional[List]:
+        """Get query filters in fixture terms; None if they select another session"""
+        filters = []
+        for key, value in request.query.items():
+            field, op, value = parse_filter(key, value)
+            if field in ("session_key", "meeting_key"):
+                own_key = self.fixture.session_key if field == "session_key" else self.fixture.meeting_key
+                if value != "latest" and str(value) != str(own_key):
+                    return None
+                continue
+
+            if field in DATE_FIELDS:
+                value = parse_epoch(value)
+                if value is not None and self.clock:
+                    value = self.clock.to_fixture(value)
+            filters.append((field, op, value))
+        return filters
+
+    def _serve_row(self, table, index: int) -> Dict:
+        """Get a row as served, with dates rebased onto the wall clock when replaying"""
+        row = table.rows[index]
+        if not self.clock:
+            return row
+        row = dict(row)
+        for field, epoch in table.epochs[index].items():
+            if epoch is not None:
+                row[field] = format_epoch(self.clock.to_wall(epoch))
+        return row
+
+    async def handle_stats(self, request: web.Request) -> web.Response:
+        """Request counts and the replay position"""
+        return web.json_response(self.stats())
+
+    async def handle_config(self, request: web.Request) -> web.Response:
+        """Change latency, error and 429 injection while running"""
+        settings = await request.json()
+        for name in INJECTION_SETTINGS:
+            if name in settings:
+                setattr(self, name, float(settings[name]))
+        logger.info(f"Injection settings: {self._settings()}")
+        return web.json_response(self._settings())
+
+    def _settings(self) -> Dict:
+        return {name: getattr(self, name) for name in INJECTION_SETTINGS}
+
+    def stats(self) -> Dict:
+        """Get mock server metrics"""
+        stats = {
+            "session_key": self.fixture.session_key,
+            "requests": dict(self.requests),
+            "total_requests": sum(self.requests.values()),
+            "errors": self.errors,
+            "throttled": self.throttled,
+            "rows_served": self.rows_served,
+            "bytes_served": self.bytes_served,
+            "settings": self._settings(),
+        }
+        if self.clock:
+            now = self.clock.now()
+            stats["replay"] = {
+                "speed": self.clock.speed,
+                "fixture_time": format_epoch(now),
+                "session_elapsed": round(now - self.fixture.start, 1),
+            }
+        return stats
+
+async def start_server(mock: MockOpenF1, host: str = "127.0.0.1", port: int = 8001) -> web.AppRunner:
+    """Start serving in the running event loop; stop with `await runner.cleanup()`"""
+    runner = web.AppRunner(mock.create_app(), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info(f"Mock OpenF1 serving session {mock.fixture.session_key} at http://{host}:{port}/v1")
+    return runner
@@ -0,0 +1,109 @@
+"""
+Circuit Breaker - Fail fast per upstream endpoint while OpenF1 is down
+"""
+
+import logging
+import time
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict
+
+logger = logging.getLogger(__name__)
+
+# Breaker states
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Transitions kept per breaker for /health
+TRANSITION_HISTORY = 20
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.rejected = 0
+        self.transitions: Deque[Dict] = deque(maxlen=TRANSITION_HISTORY)
+
+    def _transition(self, state: str):
+        """Move to a new state and record the transition"""
+        if state == self.state:
+            return
+        logger.warning(f"Circuit breaker for {self.name}: {self.state} -> {state}")
+        self.transitions.append({
+            'from': self.state,
+            'to': state,
+            'at': datetime.utcnow().isoformat()
+        })
+        self.state = state
+
+    def allow_request(self) -> bool:
+        """Whether a request may go upstream now; half-open lets one probe through"""
+        if self.state == CLOSED:
+            return True
+
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self._transition(HALF_OPEN)
+
+        if self.state == HALF_OPEN and not self.probe_in_flight:
+            self.probe_in_flight = True
+            return True
+
+        self.rejected += 1
+        return False
+
+    def record_success(self):
+        """An upstream request succeeded"""
+        self.failures = 0
+        self.probe_in_flight = False
+        self._transition(CLOSED)
+
+    def record_failure(self):
+        """An upstream request failed or timed out"""
+        self.failures += 1
+        self.probe_in_flight = False
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            self._transition(OPEN)
+
+    def release_probe(self):
+        """The probe ended without a result (e.g. cancelled); allow another"""
+        self.probe_in_flight = False
+
+    def stats(self) -> Dict:
+        """Get breaker state for health reporting"""
+        retry_in = 0.0
+        if self.state == OPEN:
+            retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+        return {
+            'state': self.state,
+            'failures': self.failures,
+            'rejected': self.rejected,
+            'retry_in': round(retry_in, 1),
+            'transitions': list(self.transitions)
+        }
+
+class CircuitBreakerRegistry:
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, endpoint: str) -> CircuitBreaker:
+        """Get the breaker for an endpoint, creating it closed"""
+        breaker = self._breakers.get(endpoint)
+        if breaker is None:
+            breaker = self._breakers[endpoint] = CircuitBreaker(
+                endpoint, self.failure_threshold, self.reset_timeout
+            )
+        return breaker
+
+    def stats(self) -> Dict:
+        """Get the state of every breaker"""
+        return {endpoint: breaker.stats() for endpoint, breaker in self._breakers.items()}
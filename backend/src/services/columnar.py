@@ -0,0 +1,289 @@
+"""
+Columnar - NumPy column storage for session time-series rows
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Column kinds: 'time' holds ISO dates as int64 epoch-ns, 'segments' holds
+# mini-sector lists packed as int16 bytes, 'object' holds values as they
+# are; anything else is a NumPy dtype
+TIME = 'time'
+SEGMENTS = 'segments'
+OBJECT = 'object'
+
+# Per-endpoint columns. Fields missing from a schema, values of another
+# type and session-wide constants are handled by ColumnarTable below.
+COLUMNAR_SCHEMAS: Dict[str, Dict[str, str]] = {
+    'position': {
+        'driver_number': 'int16',
+        'date': TIME,
+        'position': 'int16',
+    },
+    'intervals': {
+        'driver_number': 'int16',
+        'date': TIME,
+        'gap_to_leader': 'float64',
+        'interval': 'float64',
+    },
+    'laps': {
+        'driver_number': 'int16',
+        'lap_number': 'int16',
+        'date_start': TIME,
+        'lap_duration': 'float64',
+        'duration_sector_1': 'float64',
+        'duration_sector_2': 'float64',
+        'duration_sector_3': 'float64',
+        'i1_speed': 'int16',
+        'i2_speed': 'int16',
+        'st_speed': 'int16',
+        'is_pit_out_lap': 'bool',
+        'segments_sector_1': SEGMENTS,
+        'segments_sector_2': SEGMENTS,
+        'segments_sector_3': SEGMENTS,
+    },
+}
+
+# Fields with one value per session, stored once per table
+CONSTANT_FIELDS = ('session_key', 'meeting_key')
+
+# Missing values in integer and time columns (NaN in float columns)
+INT_MISSING = {'int16': np.iinfo(np.int16).min, 'int32': np.iinfo(np.int32).min}
+TIME_MISSING = np.iinfo(np.int64).min
+
+_ABSENT = object()  # marks a schema field the row did not have
+
+def parse_time_ns(value: Any) -> Optional[int]:
+    """Parse an OpenF1 ISO date into epoch nanoseconds"""
+    if not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return (parsed - EPOCH) // timedelta(microseconds=1) * 1000
+
+def format_time_ns(value: int) -> str:
+    """Format epoch nanoseconds the way OpenF1 does"""
+    return (EPOCH + timedelta(microseconds=int(value) // 1000)).isoformat()
+
+class ColumnarTable:
+    """Rows of one endpoint held as growable NumPy columns.
+
+    Rows convert back to dicts exactly as they were received: constants
+    are stored once, and the rare value that does not fit its column
+    (a "+1 LAP" gap, an int in a float column, an unknown field) is
+    kept per row in a small overrides map.
+    """
+
+    def __init__(self, schema: Dict[str, str], capacity: int = 256):
+        self.schema = schema
+        self.size = 0
+        self._columns: Dict[str, np.ndarray] = {
+            name: np.empty(capacity, dtype=self._dtype(kind)) for name, kind in schema.items()
+        }
+        self.constants: Dict[str, Any] = {}
+        self._field_order: Optional[List[str]] = None
+        self._overrides: Dict[int, Dict[str, Any]] = {}
+
+    def _dtype(self, kind: str):
+        if kind == TIME:
+            return np.int64
+        if kind == 'bool':
+            return np.int8
+        if kind == SEGMENTS:
+            return object
+        return np.dtype(kind)
+
+    def _grow(self):
+        for name, column in self._columns.items():
+            grown = np.empty(max(len(column) * 2, 16), dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            self._columns[name] = grown
+
+    def append(self, row: Dict) -> int:
+        """Append a row, returning its index"""
+        if self.size == len(next(iter(self._columns.values()))):
+            self._grow()
+        index = self.size
+        self.size += 1
+        self._write(index, row)
+        return index
+
+    def update(self, index: int, row: Dict):
+        """Replace the row at an index"""
+        self._overrides.pop(index, None)
+        self._write(index, row)
+
+    def _write(self, index: int, row: Dict):
+        if self._field_order is None:
+            self._field_order = list(row)
+            for name in CONSTANT_FIELDS:
+                if name in row:
+                    self.constants[name] = row[name]
+
+        overrides = {}
+        for name, kind in self.schema.items():
+            value = row.get(name, _ABSENT)
+            stored = self._encode(kind, value)
+            if stored is _ABSENT:
+                # Keep the original; the column holds its missing marker
+                overrides[name] = value
+                stored = self._encode(kind, None)
+            self._columns[name][index] = stored
+
+        for name, value in row.items():
+            if name in self.schema:
+                continue
+            if name in self.constants and self.constants[name] == value:
+                continue
+            overrides[name] = value
+        for name in self.constants:
+            if name not in row:
+                overrides[name] = _ABSENT
+
+        if list(row) != self._field_order:
+            overrides['__order__'] = list(row)
+        if overrides:
+            self._overrides[index] = overrides
+
+    def _encode(self, kind: str, value: Any) -> Any:
+        """Column value for a field, or _ABSENT when it does not fit the column"""
+        if kind == OBJECT:
+            return None if value is _ABSENT else value
+        if value is None:
+            if kind == SEGMENTS:
+                return None
+            if kind == TIME:
+                return TIME_MISSING
+            if kind == 'bool':
+                return -1
+            if kind == 'float64':
+                return np.nan
+            return INT_MISSING[kind]
+        if kind == TIME:
+            ns = parse_time_ns(value)
+            if ns is None or format_time_ns(ns) != value:
+                return _ABSENT
+            return ns
+        if kind == SEGMENTS:
+            if type(value) is not list or not all(type(item) is int and -32768 <= item < 32768 for item in value):
+                return _ABSENT
+            return np.array(value, dtype=np.int16).tobytes()
+        if kind == 'bool':
+            return int(value) if type(value) is bool else _ABSENT
+        if kind == 'float64':
+            return value if type(value) is float else _ABSENT
+        if type(value) is int and INT_MISSING[kind] < value <= np.iinfo(kind).max:
+            return value
+        return _ABSENT
+
+    def _decode(self, kind: str, value: Any) -> Any:
+        if kind == OBJECT:
+            return value
+        if kind == SEGMENTS:
+            return None if value is None else np.frombuffer(value, dtype=np.int16).tolist()
+        if kind == TIME:
+            return None if value == TIME_MISSING else format_time_ns(value)
+        if kind == 'bool':
+            return None if value < 0 else bool(value)
+        if kind == 'float64':
+            return None if np.isnan(value) else float(value)
+        return None if value == INT_MISSING[kind] else int(value)
+
+    def column(self, name: str) -> np.ndarray:
+        """A view of one column over the stored rows"""
+        return self._columns[name][:self.size]
+
+    def row(self, index: int) -> Dict:
+        """Convert one row back to a dict"""
+        values = dict(self.constants)
+        for name, kind in self.schema.items():
+            values[name] = self._decode(kind, self._columns[name][index])
+
+        overrides = self._overrides.get(index)
+        order = self._field_order or list(values)
+        if overrides:
+            for name, value in overrides.items():
+                if name != '__order__':
+                    values[name] = value
+            order = overrides.get('__order__', order)
+        return {name: values[name] for name in order if values.get(name, _ABSENT) is not _ABSENT}
+
+    def to_dicts(self, indices: Optional[Sequence[int]] = None) -> List[Dict]:
+        """Convert rows (all of them, or the given indices) back to dicts"""
+        if indices is None:
+            indices = range(self.size)
+        return [self.row(index) for index in indices]
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the columns (capacity included)"""
+        return sum(column.nbytes for column in self._columns.values())
+
+class ColumnarIndex:
+    """A table's rows ordered by driver, then by an order field.
+
+    Built once per dataset version with one vectorized sort. Each driver's
+    rows are a contiguous range of the sorted columns, so per-driver and
+    time-range slices are views rather than copies.
+    """
+
+    def __init__(self, table: ColumnarTable, order_field: str):
+        self.table = table
+        self.order_field = order_field
+        drivers = table.column('driver_number')
+        self._order = np.lexsort((table.column(order_field), drivers))
+        self._sorted: Dict[str, np.ndarray] = {}
+
+        sorted_drivers = drivers[self._order]
+        starts = np.flatnonzero(np.diff(sorted_drivers)) + 1
+        bounds = np.concatenate(([0], starts, [len(sorted_drivers)]))
+        self._ranges: Dict[Any, slice] = {}
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            if start < end:
+                driver_number = table._decode(table.schema['driver_number'], sorted_drivers[start])
+                self._ranges[driver_number] = slice(int(start), int(end))
+
+    def drivers(self) -> List[Any]:
+        return list(self._ranges)
+
+    def column(self, name: str, driver_number: Any = None) -> np.ndarray:
+        """A column in index order, for all drivers or a view for one"""
+        column = self._sorted.get(name)
+        if column is None:
+            column = self._sorted[name] = self.table.column(name)[self._order]
+        if driver_number is None:
+            return column
+        return column[self._ranges.get(driver_number, slice(0, 0))]
+
+    def time_range(self, driver_number: Any, start: Optional[datetime] = None,
+                   end: Optional[datetime] = None) -> slice:
+        """Index range of one driver's rows with start <= order field < end"""
+        span = self._ranges.get(driver_number, slice(0, 0))
+        times = self.column(self.order_field)[span]
+        low = 0 if start is None else int(np.searchsorted(times, (start - EPOCH) // timedelta(microseconds=1) * 1000))
+        high = len(times) if end is None else int(np.searchsorted(times, (end - EPOCH) // timedelta(microseconds=1) * 1000))
+        return slice(span.start + low, span.start + high)
+
+    def to_dicts(self, positions: Sequence[int]) -> List[Dict]:
+        """Rows at positions of the index order as dicts"""
+        return self.table.to_dicts(self._order[positions])
+
+    def rows(self, driver_number: Any) -> List[Dict]:
+        """One driver's rows as dicts, oldest first"""
+        return self.table.to_dicts(self._order[self._ranges.get(driver_number, slice(0, 0))])
+
+    def latest(self, driver_number: Any) -> Optional[Dict]:
+        """One driver's latest row as a dict"""
+        span = self._ranges.get(driver_number)
+        return self.table.row(self._order[span.stop - 1]) if span else None
+
+    def count(self, driver_number: Any) -> int:
+        span = self._ranges.get(driver_number)
+        return span.stop - span.start if span else 0
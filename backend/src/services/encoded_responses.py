@@ -0,0 +1,98 @@
+"""
+Encoded Responses - Pre-serialized JSON bodies for hot API routes
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Bodies smaller than this are not worth compressing
+GZIP_MIN_SIZE = 1024
+
+class EncodedBody:
+    def __init__(self, body: bytes):
+        self.body = body
+        self._gzipped: Optional[bytes] = None
+
+        # Weak: the same tag covers the identity and gzip representations
+        self.etag = f'W/"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+
+    @property
+    def gzipped(self) -> Optional[bytes]:
+        """Gzip-compressed body, compressed once on first use"""
+        if len(self.body) < GZIP_MIN_SIZE:
+            return None
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.body, compresslevel=5)
+        return self._gzipped
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison)"""
+    if not if_none_match:
+        return False
+
+    opaque_tag = etag[2:] if etag.startswith('W/') else etag
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*':
+            return True
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == opaque_tag:
+            return True
+    return False
+
+def encode_json(payload: Any) -> bytes:
+    """Encode a payload the way FastAPI's JSONResponse does"""
+    return json.dumps(
+        payload,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+        default=str
+    ).encode("utf-8")
+
+class EncodedResponseCache:
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[Hashable, EncodedBody]]" = OrderedDict()
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+
+    def peek(self, key: Hashable, version: Hashable) -> Optional[EncodedBody]:
+        """Get the encoded body for a key if it was built at this data version"""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != version:
+            return None
+        return entry[1]
+
+    def get_or_encode(self, key: Hashable, version: Hashable, build: Callable[[], Any]) -> EncodedBody:
+        """Get the encoded body for a key at a data version, building it on a miss"""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == version:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[1]
+
+        self.misses += 1
+        encoded = EncodedBody(encode_json(build()))
+        self._entries[key] = (version, encoded)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return encoded
+
+    def stats(self) -> Dict:
+        """Get cache counters"""
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses
+        }
@@ -5,28 +5,162 @@ F1 Service - Completely refactored with proper error handling and rate limiting
 import aiohttp
 import asyncio
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Awaitable, Callable
+import hashlib
 import json
+import random
+import time
+from collections import deque
+from contextvars import ContextVar
+
+from src.services import freshness
+from src.services.circuit_breaker import CircuitBreakerRegistry
+from src.services.lap_statistics import compute_lap_statistics, page_laps
+from src.services.metrics import MetricsRegistry, counter, gauge
+from src.services.rate_limiter import TokenBucketRateLimiter, parse_retry_after
+from src.services.request_timing import record_stage, timed_stage
+from src.services.response_cache import ResponseCache
+from src.services.session_datasets import INCREMENTAL_ENDPOINTS, WINDOWED_ENDPOINTS, SessionDatasetStore
+from src.services.session_resolver import SessionResolver
+from src.services.timing_board import TimingBoard
+from src.services.shared_cache import LogCompacted, SharedCache
+from src.utils.json_stream import JsonArrayStreamDecoder
 
 logger = logging.getLogger(__name__)
 
+OPENF1_BASE_URL = "https://api.openf1.org/v1"
+
+# Endpoints behind get_comprehensive_timing_data
+TIMING_ENDPOINTS = ("drivers", "position", "intervals", "laps", "stints", "pit")
+
+# How long a worker holds a shared refresh lock, and how long others wait on it
+SHARED_LOCK_TTL = 30
+SHARED_WAIT_TIMEOUT = 10
+SHARED_POLL_INTERVAL = 0.1
+
+# Records a worker appends to a shared sync log before compacting it into a snapshot
+SHARED_LOG_COMPACT_EVERY = 100
+
+# Upstream latency samples kept per endpoint, and how many are needed before hedging
+LATENCY_SAMPLES = 200
+HEDGE_MIN_SAMPLES = 20
+HEDGE_MIN_DELAY = 0.05
+
+# Bodies at least this large, compressed or of unknown size are decoded as a stream
+STREAM_DECODE_THRESHOLD = 64 * 1024
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Age/staleness of the data served in the current request context
+_data_freshness: ContextVar[Optional[Dict]] = ContextVar('f1_data_freshness', default=None)
+
+def track_data_freshness() -> Dict:
+    """Start collecting data age for the current request context"""
+    freshness = {'age': 0.0, 'stale': False}
+    _data_freshness.set(freshness)
+    return freshness
+
+def get_data_freshness() -> Optional[Dict]:
+    """Get the freshness collected for the current request context, if any"""
+    return _data_freshness.get()
+
 class F1Service:
-    def __init__(self):
-        self.base_url = "https://api.openf1.org/v1"
+    def __init__(self, fan_out: bool = True, max_concurrent_requests: int = 6,
+                 cache_max_entries: int = 2048, cache_max_bytes: int = 64 * 1024 * 1024,
+                 rate_limit: float = 3.0, rate_limit_burst: int = 3,
+                 shared_cache: Optional[SharedCache] = None,
+                 breaker_failure_threshold: int = 5, breaker_reset_timeout: float = 30.0,
+                 max_retries: int = 2, request_deadline: float = 20.0, hedge_requests: bool = False,
+                 base_url: str = OPENF1_BASE_URL, metrics: Optional[MetricsRegistry] = None):
+        self.base_url = base_url
         self.session: Optional[aiohttp.ClientSession] = None
-        self.cache: Dict[str, Dict] = {}
-        self.cache_ttl = 60  # 1 minute cache
+        self.cache = ResponseCache(max_entries=cache_max_entries, max_bytes=cache_max_bytes)
+        self.cache_ttl = 60  # 1 minute cache, unless the freshness policy says otherwise
+        
+        # Stale-while-revalidate: past cache_ttl serve stale and refresh in
+        # the background; past cache_hard_ttl callers wait for upstream
+        self.stale_while_revalidate = True
+        self.cache_hard_ttl = 300
+        self.background_refreshes = 0
+        
+        # Cache shared with other worker processes, if configured
+        self.shared_cache = shared_cache
+        self.shared_hits = 0
+        self.shared_waits = 0
+        self.shared_compactions = 0
+        self._shared_log_appends: Dict[str, int] = {}
+        
+        # Growing per-session datasets, synced incrementally from a cursor,
+        # and sliding windows for location/car_data
+        self.datasets = SessionDatasetStore()
+        
+        # Known session dates, used to pick per-endpoint freshness policy
+        self.sessions_by_key: Dict[str, Dict] = {}
+        
+        # Sessions kept fresh by the live ingestor; requests never refresh them
+        self.ingested_sessions: set = set()
+        
+        # Current session for "latest" routes, resolved without a per-request lookup
+        self.session_resolver = SessionResolver(self._fetch_current_session)
+        
+        # Token bucket shared by all upstream requests
+        self.rate_limiter = TokenBucketRateLimiter(rate=rate_limit, burst=rate_limit_burst)
+
+        # Concurrent fan-out for composite calls, capped by a semaphore
+        self.fan_out = fan_out
+        self.max_concurrent_requests = max_concurrent_requests
+        self._request_semaphore = asyncio.Semaphore(max_concurrent_requests)
+
+        # Single-flight: one upstream fetch per cache key, shared by concurrent callers
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.upstream_requests = 0
+        self.coalesced_requests = 0
+        
+        # Live timing board per session, updated from new dataset rows, and
+        # the last timing result, reused while its board version is unchanged
+        self._timing_boards: Dict[str, TimingBoard] = {}
+        self._timing_results: Dict[str, tuple] = {}
+        
+        # Lap statistics per session, recomputed only when the laps dataset changes
+        self._lap_statistics: Dict[str, tuple] = {}
+        
+        # Time the event loop spends blocked decoding response bodies
+        self.decode_stats = {
+            'responses': 0,
+            'streamed': 0,
+            'last_loop_block_ms': 0.0,
+            'max_loop_block_ms': 0.0
+        }
         
-        # Simple rate limiting
-        self.last_request_time = 0
-        self.min_request_interval = 0.5  # 500ms between requests
+        # Per-endpoint circuit breakers: fail fast during upstream outages
+        self.circuit_breakers = CircuitBreakerRegistry(breaker_failure_threshold, breaker_reset_timeout)
+        
+        # Retries with exponential backoff and full jitter, bounded by a per-request deadline
+        self.max_retries = max_retries
+        self.retry_backoff_base = 0.25
+        self.retry_backoff_max = 4.0
+        self.request_deadline = request_deadline
+        self.retries = 0
+        
+        # Hedged requests: race a second attempt once the first passes the endpoint's p95
+        self.hedge_requests = hedge_requests
+        self.upstream_latencies: Dict[str, deque] = {}
+        self.hedged_requests = 0
+        self.hedge_wins = 0
         
         # Health tracking
         self.consecutive_failures = 0
         self.max_failures = 5
         self.is_healthy = True
         
+        # Upstream metrics for /metrics; the rest is read from stats() at scrape time
+        self.metrics = metrics or MetricsRegistry()
+        self.metrics.counter('f1_upstream_requests_total', 'OpenF1 responses by endpoint and status')
+        self.metrics.counter('f1_upstream_response_bytes_total', 'OpenF1 response body bytes by endpoint')
+        self.metrics.histogram('f1_upstream_request_duration_seconds', 'OpenF1 request latency by endpoint and outcome')
+        self.metrics.histogram('f1_rate_limiter_wait_seconds', 'Time upstream requests waited for a rate limit token')
+        self.metrics.add_collector(self._collect_metrics)
+        
     async def initialize(self):
         """Initialize the HTTP client session"""
         connector = aiohttp.TCPConnector(
@@ -54,27 +188,55 @@ class F1Service:
         if self.session:
             await self.session.close()
             logger.info("F1Service closed")
+        if self.shared_cache:
+            await self.shared_cache.close()
 
     def _get_cache_key(self, endpoint: str, params: Dict = None) -> str:
-        """Generate cache key"""
-        params_str = json.dumps(params or {}, sort_keys=True)
-        return f"{endpoint}_{hash(params_str)}"
+        """Generate cache key, identical in every worker process"""
+        params_str = json.dumps(params or {}, sort_keys=True, default=str)
+        return f"{endpoint}_{hashlib.sha1(params_str.encode('utf-8')).hexdigest()[:16]}"
 
-    def _is_cache_valid(self, cache_entry: Dict) -> bool:
-        """Check if cache entry is still valid"""
-        cache_age = datetime.now() - cache_entry['timestamp']
-        return cache_age < timedelta(seconds=self.cache_ttl)
+    def _cache_age(self, cache_entry: Dict) -> float:
+        """Get the age of a cache entry in seconds"""
+        return (datetime.now() - cache_entry['timestamp']).total_seconds()
 
-    async def _wait_for_rate_limit(self):
-        """Simple rate limiting"""
-        current_time = datetime.now().timestamp()
-        time_since_last = current_time - self.last_request_time
-        
-        if time_since_last < self.min_request_interval:
-            wait_time = self.min_request_interval - time_since_last
-            await asyncio.sleep(wait_time)
-        
-        self.last_request_time = datetime.now().timestamp()
+    def get_session_state(self, session_key: Optional[Any]) -> str:
+        """Get whether a known session is live, upcoming or completed"""
+        if session_key is None:
+            return freshness.UNKNOWN
+        return freshness.get_session_state(self.sessions_by_key.get(str(session_key)))
+
+    def _get_ttls(self, endpoint: str, params: Optional[Dict]) -> tuple:
+        """Get (soft, hard) cache TTLs for a request from the freshness policy"""
+        state = self.get_session_state((params or {}).get('session_key'))
+        return freshness.get_ttls(endpoint, state, (self.cache_ttl, self.cache_hard_ttl))
+
+    def _serving_ttls(self, endpoint: str, params: Optional[Dict]) -> tuple:
+        """Get TTLs for answering a request; ingested sessions are always served from memory"""
+        if str((params or {}).get('session_key')) in self.ingested_sessions:
+            return float('inf'), float('inf')
+        return self._get_ttls(endpoint, params)
+
+    def _remember_sessions(self, sessions: List[Dict]):
+        """Keep session dates so data TTLs can follow the session state"""
+        for session in sessions:
+            if isinstance(session, dict) and session.get('session_key') is not None:
+                self.sessions_by_key[str(session['session_key'])] = {
+                    'date_start': session.get('date_start'),
+                    'date_end': session.get('date_end')
+                }
+
+    def _record_freshness(self, age: float, stale: bool):
+        """Record the age of data served to the current request"""
+        freshness = _data_freshness.get()
+        if freshness is not None:
+            freshness['age'] = max(freshness['age'], age)
+            freshness['stale'] = freshness['stale'] or stale
+
+    def _cached_fallback(self, cache_key: str) -> List[Dict]:
+        """Return stale cached data after an upstream failure, if available"""
+        cache_entry = self.cache.peek(cache_key)
+        return cache_entry['data'] if cache_entry else []
 
     async def _make_request(self, endpoint: str, params: Dict = None) -> List[Dict]:
         """Make HTTP request with proper error handling"""
@@ -83,102 +245,612 @@ class F1Service:
 
         # Check cache first
         cache_key = self._get_cache_key(endpoint, params)
-        if cache_key in self.cache and self._is_cache_valid(self.cache[cache_key]):
+        soft_ttl, hard_ttl = self._serving_ttls(endpoint, params)
+        cache_entry = self.cache.get(cache_key)
+        age = self._cache_age(cache_entry) if cache_entry else None
+
+        data = await self._read_through(
+            cache_key, age, soft_ttl, hard_ttl,
+            lambda: self._fetch_and_cache(endpoint, params, cache_key)
+        )
+        if data is None:
             logger.debug(f"Cache hit for {endpoint}")
-            return self.cache[cache_key]['data']
+            return cache_entry['data']
+        
+        # A failed fetch may have fallen back to the stale entry
+        cache_entry = self.cache.peek(cache_key)
+        if cache_entry:
+            age = self._cache_age(cache_entry)
+            self._record_freshness(age, age >= soft_ttl)
+        return data
+
+    async def _read_through(self, key: str, age: Optional[float], soft_ttl: float, hard_ttl: float,
+                            refresh: Callable[[], Awaitable[List[Dict]]]) -> Optional[List[Dict]]:
+        """Decide between cached data of the given age and a refresh.
+
+        Returns None when the cached copy should be served (refreshing it in
+        the background if stale), otherwise the result of the single-flight
+        refresh the caller had to wait for.
+        """
+        if age is not None:
+            if age < soft_ttl:
+                self._record_freshness(age, False)
+                return None
+            
+            if self.stale_while_revalidate and age < hard_ttl:
+                # Serve stale data now, refresh in the background
+                logger.debug(f"Serving stale {key} ({age:.1f}s old), refreshing")
+                if key not in self._inflight:
+                    self.background_refreshes += 1
+                    self._single_flight(key, refresh)
+                self._record_freshness(age, True)
+                return None
+
+        # Join an in-flight refresh for the same key instead of starting another
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced_requests += 1
+            logger.debug(f"Coalesced request for {key}")
+        else:
+            task = self._single_flight(key, refresh)
+
+        # Shield so a cancelled caller does not cancel the refresh for everyone else
+        return await asyncio.shield(task)
+
+    def _single_flight(self, key: str, refresh: Callable[[], Awaitable[List[Dict]]]) -> asyncio.Task:
+        """Start the single refresh for a key"""
+        task = asyncio.ensure_future(refresh())
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return task
 
-        # Rate limiting
-        await self._wait_for_rate_limit()
+    async def _fetch_and_cache(self, endpoint: str, params: Optional[Dict], cache_key: str) -> List[Dict]:
+        """Fetch an endpoint from OpenF1 and cache the result"""
+        if self.shared_cache:
+            data = await self._fetch_shared(endpoint, params, cache_key)
+        else:
+            data = await self._request_upstream(endpoint, params)
+        if data is None:
+            # Return cached data if available
+            if cache_key in self.cache:
+                logger.info(f"Returning cached data for {endpoint}")
+            return self._cached_fallback(cache_key)
 
-        url = f"{self.base_url}/{endpoint}"
+        self.cache.set(cache_key, data)
+        if endpoint == "sessions":
+            self._remember_sessions(data)
+        return data
+
+    async def _fetch_shared(self, endpoint: str, params: Optional[Dict], cache_key: str) -> Optional[List[Dict]]:
+        """Fetch through the shared cache so only one worker goes upstream per key"""
+        soft_ttl, hard_ttl = self._get_ttls(endpoint, params)
+        
+        async def read_fresh_entry() -> Optional[Dict]:
+            try:
+                value = await self.shared_cache.get(cache_key)
+            except Exception as e:
+                logger.error(f"Shared cache read failed for {endpoint}: {e}")
+                return None
+            entry = json.loads(value) if value else None
+            if entry and time.time() - entry['timestamp'] < soft_ttl:
+                return entry
+            return None
+
+        entry = await read_fresh_entry()
+        if entry is None and not await self._acquire_shared_lock(cache_key):
+            # Another worker is refreshing this key; wait for its result
+            self.shared_waits += 1
+            entry = await self._poll_shared(read_fresh_entry)
+        
+        if entry is not None:
+            self.shared_hits += 1
+            self.cache.set(cache_key, entry['data'], datetime.fromtimestamp(entry['timestamp']))
+            return entry['data']
         
+        try:
+            data = await self._request_upstream(endpoint, params)
+            if data is not None:
+                value = json.dumps({'timestamp': time.time(), 'data': data}).encode('utf-8')
+                try:
+                    await self.shared_cache.set(cache_key, value, hard_ttl)
+                except Exception as e:
+                    logger.error(f"Shared cache write failed for {endpoint}: {e}")
+            return data
+        finally:
+            await self._release_shared_lock(cache_key)
+
+    async def _poll_shared(self, check: Callable[[], Awaitable[Any]]) -> Any:
+        """Poll the shared cache until check() returns a result or the wait times out"""
+        deadline = time.monotonic() + SHARED_WAIT_TIMEOUT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(SHARED_POLL_INTERVAL)
+            result = await check()
+            if result:
+                return result
+        return None
+
+    async def _get_session_dataset(self, endpoint: str, session_key: str) -> List[Dict]:
+        """Get the accumulated rows of a growing session endpoint, syncing only the delta"""
+        dataset = await self.sync_dataset(endpoint, session_key)
+        return dataset.rows
+
+    async def sync_dataset(self, endpoint: str, session_key: str):
+        """Sync a growing session endpoint and return its dataset.
+
+        For callers that read columns or driver indexes, or convert rows to
+        dicts only when their response changes.
+        """
+        if not self.session:
+            await self.initialize()
+
+        dataset = self.datasets.get(session_key, endpoint)
+        soft_ttl, hard_ttl = self._serving_ttls(endpoint, {'session_key': session_key})
+        sync_key = f"sync:{endpoint}:{session_key}"
+
+        data = await self._read_through(
+            sync_key, dataset.age(), soft_ttl, hard_ttl,
+            lambda: self._sync_dataset(dataset, session_key)
+        )
+        if data is not None:
+            age = dataset.age()
+            if age is not None:
+                self._record_freshness(age, age >= soft_ttl)
+        return dataset
+
+    async def refresh_endpoint(self, endpoint: str, session_key: str):
+        """Refresh a session endpoint now, regardless of cache age (used by the live ingestor)"""
+        if not self.session:
+            await self.initialize()
+
+        if endpoint in INCREMENTAL_ENDPOINTS or endpoint in WINDOWED_ENDPOINTS:
+            dataset = self.datasets.get(session_key, endpoint)
+            key = f"sync:{endpoint}:{session_key}"
+            refresh = lambda: self._sync_dataset(dataset, session_key)
+        else:
+            params = {"session_key": session_key}
+            key = self._get_cache_key(endpoint, params)
+            refresh = lambda: self._fetch_and_cache(endpoint, params, key)
+
+        await self._read_through(key, None, 0, 0, refresh)
+
+    async def _sync_dataset(self, dataset, session_key: str):
+        """Fetch rows past the dataset cursor and merge them in"""
+        if self.shared_cache:
+            return await self._sync_dataset_shared(dataset, session_key)
+        
+        params = {"session_key": session_key, **dataset.cursor_params()}
+        rows = await self._request_upstream(dataset.endpoint, params)
+        if rows is not None:
+            changed = dataset.merge(rows)
+            logger.debug(f"Synced {dataset.endpoint} for session {session_key}: "
+                         f"{len(rows)} fetched, {changed} new or changed, {dataset.row_count()} total")
+        return dataset
+
+    async def _sync_dataset_shared(self, dataset, session_key: str):
+        """Sync a dataset through the shared log that every worker replays"""
+        log_key = f"dataset:{dataset.endpoint}:{session_key}"
+        soft_ttl, _ = self._get_ttls(dataset.endpoint, {"session_key": session_key})
+        
+        async def replay_is_fresh() -> bool:
+            await self._replay_shared_log(dataset, log_key)
+            age = dataset.age()
+            return age is not None and age < soft_ttl
+
+        if await replay_is_fresh():
+            self.shared_hits += 1
+            return dataset
+        
+        if not await self._acquire_shared_lock(log_key):
+            # Another worker is syncing; pick up its rows from the log
+            self.shared_waits += 1
+            if await self._poll_shared(replay_is_fresh):
+                self.shared_hits += 1
+                return dataset
+            # The other worker is stuck; sync locally without publishing
+            params = {"session_key": session_key, **dataset.cursor_params()}
+            rows = await self._request_upstream(dataset.endpoint, params)
+            if rows is not None:
+                dataset.merge(rows)
+            return dataset
+        
+        try:
+            # Catch up on anything appended before we took the lock
+            await self._replay_shared_log(dataset, log_key)
+            params = {"session_key": session_key, **dataset.cursor_params()}
+            rows = await self._request_upstream(dataset.endpoint, params)
+            if rows is None:
+                return dataset
+            
+            record = json.dumps({'fetched_at': time.time(), 'rows': rows}).encode('utf-8')
+            try:
+                await self.shared_cache.append(log_key, record)
+            except Exception as e:
+                logger.error(f"Shared log append failed for {log_key}: {e}")
+                dataset.merge(rows)
+                return dataset
+            
+            # Our own record is merged along with anything else appended
+            await self._replay_shared_log(dataset, log_key)
+            
+            appends = self._shared_log_appends.get(log_key, 0) + 1
+            self._shared_log_appends[log_key] = appends
+            if appends >= SHARED_LOG_COMPACT_EVERY:
+                await self._compact_shared_log(dataset, log_key)
+            return dataset
+        finally:
+            await self._release_shared_lock(log_key)
+
+    async def _acquire_shared_lock(self, key: str) -> bool:
+        """Try to take the shared refresh lock; refresh locally if the store is unavailable"""
+        try:
+            return await self.shared_cache.acquire_refresh_lock(key, SHARED_LOCK_TTL)
+        except Exception as e:
+            logger.error(f"Shared lock failed for {key}: {e}")
+            return True
+
+    async def _release_shared_lock(self, key: str):
+        """Release the shared refresh lock"""
+        try:
+            await self.shared_cache.release_refresh_lock(key)
+        except Exception as e:
+            logger.error(f"Shared unlock failed for {key}: {e}")
+
+    async def _replay_shared_log(self, dataset, log_key: str):
+        """Merge sync records other workers appended since we last read the log"""
+        try:
+            try:
+                records, position = await self.shared_cache.read_log(log_key, dataset.log_position)
+            except LogCompacted as compacted:
+                # Records we had not read were compacted; pick up from the snapshot
+                start = await self._restore_shared_snapshot(dataset, log_key, compacted.start)
+                records, position = await self.shared_cache.read_log(log_key, start)
+        except Exception as e:
+            logger.error(f"Shared log read failed for {log_key}: {e}")
+            return
+        
+        for record in records:
+            self._merge_shared_record(dataset, record)
+        dataset.log_position = position
+
+    async def _restore_shared_snapshot(self, dataset, log_key: str, log_start: int) -> int:
+        """Rebuild a dataset from a compacted log's snapshot; returns the position to read on from"""
+        snapshot = await self.shared_cache.read_snapshot(log_key)
+        # The snapshot (or a recreated log) holds rows the dataset already
+        # has, and columnar datasets no longer know the keys of older rows,
+        # so start over from it rather than merging into it
+        dataset.reset()
+        if snapshot is None:
+            return log_start
+        record, position = snapshot
+        self._merge_shared_record(dataset, record)
+        logger.info(f"Restored {dataset.endpoint} from the shared log snapshot at {position}")
+        return position
+
+    def _merge_shared_record(self, dataset, record: bytes):
+        entry = json.loads(record)
+        dataset.merge(entry['rows'], datetime.fromtimestamp(entry['fetched_at']))
+
+    async def _compact_shared_log(self, dataset, log_key: str):
+        """Replace the replayed part of a shared log with a snapshot of the dataset"""
+        if dataset.fetched_at is None:
+            return
+        snapshot = json.dumps({'fetched_at': dataset.fetched_at.timestamp(), 'rows': dataset.rows}).encode('utf-8')
+        try:
+            await self.shared_cache.compact_log(log_key, snapshot, dataset.log_position)
+        except Exception as e:
+            logger.error(f"Shared log compaction failed for {log_key}: {e}")
+            return
+        self._shared_log_appends[log_key] = 0
+        self.shared_compactions += 1
+
+    async def _request_upstream(self, endpoint: str, params: Optional[Dict]) -> Optional[List[Dict]]:
+        """Request OpenF1 with retries inside a deadline; returns None when it failed"""
+        # Fail fast while the endpoint's breaker is open; callers serve cached data
+        breaker = self.circuit_breakers.get(endpoint)
+        if not breaker.allow_request():
+            logger.debug(f"Circuit open for {endpoint}, skipping upstream request")
+            return None
+        
+        deadline = time.monotonic() + self.request_deadline
+        outcome = 'failure'
+        try:
+            for attempt in range(self.max_retries + 1):
+                if attempt:
+                    # Exponential backoff with full jitter, never past the deadline
+                    backoff = random.uniform(0, min(self.retry_backoff_max, self.retry_backoff_base * 2 ** (attempt - 1)))
+                    if time.monotonic() + backoff >= deadline:
+                        break
+                    self.retries += 1
+                    logger.debug(f"Retrying {endpoint} in {backoff:.2f}s (attempt {attempt + 1})")
+                    await asyncio.sleep(backoff)
+                
+                if self.hedge_requests:
+                    data, outcome = await self._hedged_attempt(endpoint, params, deadline)
+                else:
+                    data, outcome = await self._attempt(endpoint, params, deadline)
+                if outcome != 'retry':
+                    break
+        except asyncio.CancelledError:
+            breaker.release_probe()
+            raise
+        
+        if outcome == 'success':
+            # Reset failure counter
+            self.consecutive_failures = 0
+            self.is_healthy = True
+            breaker.record_success()
+            return data
+        
+        if outcome == 'rejected':
+            breaker.release_probe()
+        else:
+            self.consecutive_failures += 1
+            breaker.record_failure()
+        
+        # Mark as unhealthy if too many failures
+        if self.consecutive_failures >= self.max_failures:
+            self.is_healthy = False
+        return None
+
+    async def _hedged_attempt(self, endpoint: str, params: Optional[Dict], deadline: float) -> tuple:
+        """Run an attempt and, if it is slower than the endpoint's p95, race a second one"""
+        hedge_after = self._latency_percentile(endpoint, 0.95)
+        first = asyncio.ensure_future(self._attempt(endpoint, params, deadline))
+        if hedge_after is None:
+            return await first
+        
+        try:
+            done, _ = await asyncio.wait({first}, timeout=hedge_after)
+        except asyncio.CancelledError:
+            # asyncio.wait does not cancel what it waits on; don't leave the
+            # attempt holding the request semaphore and a rate limit token
+            first.cancel()
+            raise
+        if done:
+            return first.result()
+        
+        self.hedged_requests += 1
+        logger.debug(f"Hedging {endpoint} after {hedge_after:.2f}s")
+        second = asyncio.ensure_future(self._attempt(endpoint, params, deadline))
+        pending = {first, second}
+        result = (None, 'retry')
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.cancelled():
+                        # aiohttp can cancel a request whose pooled connection the loser shared
+                        continue
+                    result = task.result()
+                    if result[1] == 'success':
+                        if task is second:
+                            self.hedge_wins += 1
+                        return result
+            return result
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _latency_percentile(self, endpoint: str, percentile: float) -> Optional[float]:
+        """Recent upstream latency percentile for an endpoint, once enough samples exist"""
+        samples = self.upstream_latencies.get(endpoint)
+        if not samples or len(samples) < HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(samples)
+        return max(HEDGE_MIN_DELAY, ordered[min(len(ordered) - 1, int(len(ordered) * percentile))])
+
+    async def _attempt(self, endpoint: str, params: Optional[Dict], deadline: float) -> tuple:
+        """Make one rate-limited request; returns (data, outcome).
+
+        outcome is 'success', 'retry' for transient failures (5xx, timeouts,
+        connection errors), 'failure' for ones not worth retrying, or
+        'rejected' for 429/4xx answers and deadlines that ran out before the
+        request was sent, which say nothing about upstream health.
+        """
+        async with self._request_semaphore:
+            self.upstream_requests += 1
+            
+            # Rate limiting, within the deadline. Running out of time queued
+            # behind our own limiter says nothing about upstream health.
+            queued_at = time.monotonic()
+            try:
+                waited = await asyncio.wait_for(self.rate_limiter.acquire(), max(0.0, deadline - queued_at))
+            except asyncio.TimeoutError:
+                waited = time.monotonic() - queued_at
+                record_stage('ratelimit', waited)
+                logger.warning(f"Deadline passed waiting for a rate limit token for {endpoint}")
+                return None, 'rejected'
+            self.metrics.observe('f1_rate_limiter_wait_seconds', waited)
+            record_stage('ratelimit', waited)
+
+            url = f"{self.base_url}/{endpoint}"
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None, 'rejected'
+            
+            started = time.monotonic()
+            # Stays None if the attempt is cancelled (e.g. a hedging loser)
+            result = None
+            try:
+                result = await self._send_request(url, endpoint, params, remaining, started)
+                return result[:2]
+            finally:
+                # Every completed attempt, so slow failures show up in the latency histogram
+                elapsed = time.monotonic() - started
+                if result is not None:
+                    self.metrics.observe('f1_upstream_request_duration_seconds', elapsed,
+                                         endpoint=endpoint, outcome=result[1])
+                record_stage('upstream', elapsed - (result[2] if result else 0.0))
+
+    async def _send_request(self, url: str, endpoint: str, params: Optional[Dict],
+                            remaining: float, started: float) -> tuple:
+        """Send one request and decode it; returns (data, outcome, parse time)"""
         try:
             logger.debug(f"Making request to {url} with params {params}")
             
-            async with self.session.get(url, params=params) as response:
+            timeout = aiohttp.ClientTimeout(total=remaining)
+            async with self.session.get(url, params=params, timeout=timeout) as response:
+                self.metrics.inc('f1_upstream_requests_total', endpoint=endpoint, status=str(response.status))
                 if response.status == 200:
-                    data = await response.json()
+                    data, parse_time = await self._decode_response(response, endpoint)
                     
                     # Ensure data is a list
                     if not isinstance(data, list):
                         data = [data] if data else []
                     
-                    # Cache successful response
-                    self.cache[cache_key] = {
-                        'data': data,
-                        'timestamp': datetime.now()
-                    }
-                    
-                    # Reset failure counter
-                    self.consecutive_failures = 0
-                    self.is_healthy = True
-                    
+                    self.upstream_latencies.setdefault(
+                        endpoint, deque(maxlen=LATENCY_SAMPLES)
+                    ).append(time.monotonic() - started)
                     logger.debug(f"Success: {endpoint} returned {len(data)} items")
-                    return data
+                    return data, 'success', parse_time
                     
                 elif response.status == 429:
-                    # Rate limited - wait and return cached data if available
+                    # Rate limited - hold the bucket for Retry-After
                     logger.warning(f"Rate limited on {endpoint}")
-                    await asyncio.sleep(5)  # Wait 5 seconds
-                    
-                    if cache_key in self.cache:
-                        logger.info("Returning cached data due to rate limit")
-                        return self.cache[cache_key]['data']
-                    return []
+                    self.rate_limiter.pause(parse_retry_after(response.headers.get('Retry-After')))
+                    return None, 'rejected', 0.0
                     
                 elif response.status == 404:
                     # Not found - this is normal for some endpoints
                     logger.debug(f"404 for {endpoint} - no data available")
-                    return []
+                    return [], 'success', 0.0
                     
                 else:
                     logger.error(f"HTTP {response.status} for {endpoint}")
-                    self.consecutive_failures += 1
-                    
-                    # Return cached data if available
-                    if cache_key in self.cache:
-                        return self.cache[cache_key]['data']
-                    return []
+                    return None, 'retry' if response.status >= 500 else 'rejected', 0.0
                     
         except asyncio.TimeoutError:
             logger.error(f"Timeout for {endpoint}")
-            self.consecutive_failures += 1
-            # Return cached data if available
-            if cache_key in self.cache:
-                return self.cache[cache_key]['data']
-            return []
+            self.metrics.inc('f1_upstream_requests_total', endpoint=endpoint, status='timeout')
+            return None, 'retry', 0.0
+            
+        except aiohttp.ClientError as e:
+            logger.error(f"Request error for {endpoint}: {e}")
+            self.metrics.inc('f1_upstream_requests_total', endpoint=endpoint, status='error')
+            return None, 'retry', 0.0
             
         except Exception as e:
             logger.error(f"Request error for {endpoint}: {e}")
-            self.consecutive_failures += 1
-            # Return cached data if available
-            if cache_key in self.cache:
-                return self.cache[cache_key]['data']
-            return []
+            return None, 'failure', 0.0
+
+    def get_data_version(self, session_key: str, endpoints: tuple) -> tuple:
+        """Get a version that changes whenever data for these session endpoints changes"""
+        version = []
+        for endpoint in endpoints:
+            dataset = self.datasets.peek(session_key, endpoint)
+            if dataset is not None:
+                version.append(dataset.version)
+                continue
+            
+            cache_entry = self.cache.peek(self._get_cache_key(endpoint, {"session_key": session_key}))
+            version.append(cache_entry['timestamp'] if cache_entry else None)
+        return tuple(version)
+
+    def peek_fresh_version(self, session_key: str, endpoints: tuple) -> Optional[tuple]:
+        """Get the data version if every endpoint is held and within its soft TTL.
+
+        Lets callers answer from an already-built response without touching
+        the getters; returns None when any of the data needs refreshing.
+        """
+        ages = []
+        for endpoint in endpoints:
+            dataset = self.datasets.peek(session_key, endpoint)
+            if dataset is not None:
+                age = dataset.age()
+            else:
+                cache_entry = self.cache.peek(self._get_cache_key(endpoint, {"session_key": session_key}))
+                age = self._cache_age(cache_entry) if cache_entry else None
+            
+            soft_ttl, _ = self._serving_ttls(endpoint, {"session_key": session_key})
+            if age is None or age >= soft_ttl:
+                return None
+            ages.append(age)
         
-        finally:
-            # Mark as unhealthy if too many failures
-            if self.consecutive_failures >= self.max_failures:
-                self.is_healthy = False
+        for age in ages:
+            self._record_freshness(age, False)
+        return self.get_data_version(session_key, endpoints)
+
+    async def _decode_response(self, response: aiohttp.ClientResponse, endpoint: str) -> tuple:
+        """Decode a JSON body, streaming large ones so the loop is never blocked for long.
+
+        Returns the data and the total time spent parsing it.
+        """
+        longest_block = 0.0
+        parse_time = 0.0
+        # Content-Length counts compressed bytes; only an identity body's
+        # length says how much there is to parse
+        encoding = response.headers.get('Content-Encoding', 'identity').strip().lower()
+        length = response.content_length if encoding in ('', 'identity') else None
+
+        size = 0
+        if length is not None and length < STREAM_DECODE_THRESHOLD:
+            body = await response.read()
+            size = len(body)
+            started = time.perf_counter()
+            data = json.loads(body) if body else []
+            longest_block = parse_time = time.perf_counter() - started
+        else:
+            decoder = JsonArrayStreamDecoder()
+            data = []
+            async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+                size += len(chunk)
+                started = time.perf_counter()
+                data.extend(decoder.feed(chunk))
+                block = time.perf_counter() - started
+                longest_block = max(longest_block, block)
+                parse_time += block
+                # Let other requests and WebSockets run between chunks
+                await asyncio.sleep(0)
+
+            started = time.perf_counter()
+            data.extend(decoder.close())
+            block = time.perf_counter() - started
+            longest_block = max(longest_block, block)
+            parse_time += block
+            self.decode_stats['streamed'] += 1
+
+        self.metrics.inc('f1_upstream_response_bytes_total', size, endpoint=endpoint)
+        block_ms = longest_block * 1000
+        self.decode_stats['responses'] += 1
+        self.decode_stats['last_loop_block_ms'] = round(block_ms, 3)
+        self.decode_stats['max_loop_block_ms'] = round(max(self.decode_stats['max_loop_block_ms'], block_ms), 3)
+        logger.debug(f"Decoded {endpoint}: longest loop block {block_ms:.2f} ms")
+        record_stage('parse', parse_time)
+        return data, parse_time
+
+    async def fetch_concurrently(self, *calls) -> List[Any]:
+        """Await several service calls, concurrently when fan-out is enabled"""
+        if not self.fan_out:
+            return [await call for call in calls]
+        return list(await asyncio.gather(*calls))
 
     async def get_current_session(self) -> Optional[Dict]:
-        """Get current session - simplified approach"""
+        """Get current session, held in memory and refreshed around session boundaries"""
+        with timed_stage('session'):
+            return await self.session_resolver.get()
+
+    async def _fetch_current_session(self) -> Optional[Dict]:
+        """Look up the current session upstream"""
+        if not self.session:
+            await self.initialize()
+
         try:
-            # Try to get latest session
-            sessions = await self._make_request("sessions", {"session_key": "latest"})
+            # Ask for the latest session, bypassing the cached answer
+            params = {"session_key": "latest"}
+            cache_key = self._get_cache_key("sessions", params)
+            sessions = await self._read_through(
+                cache_key, None, 0, 0,
+                lambda: self._fetch_and_cache("sessions", params, cache_key)
+            )
             if sessions:
-                session = sessions[0]
-                logger.info(f"Found session: {session.get('session_name')} at {session.get('circuit_short_name')}")
-                return session
+                return sessions[0]
             
             # Fallback: get recent sessions and find the latest
             sessions = await self._make_request("sessions", {"year": datetime.now().year})
             if sessions:
                 # Sort by date and get the most recent
                 sorted_sessions = sorted(sessions, key=lambda x: x.get('date_start', ''), reverse=True)
-                latest = sorted_sessions[0]
-                logger.info(f"Fallback session: {latest.get('session_name')} at {latest.get('circuit_short_name')}")
-                return latest
+                return sorted_sessions[0]
             
             return None
             
@@ -199,7 +871,7 @@ class F1Service:
     async def get_positions(self, session_key: str) -> List[Dict]:
         """Get current positions"""
         try:
-            positions = await self._make_request("position", {"session_key": session_key})
+            positions = await self._get_session_dataset("position", session_key)
             logger.debug(f"Found {len(positions)} position entries")
             return positions
         except Exception as e:
@@ -209,7 +881,7 @@ class F1Service:
     async def get_intervals(self, session_key: str) -> List[Dict]:
         """Get interval data"""
         try:
-            intervals = await self._make_request("intervals", {"session_key": session_key})
+            intervals = await self._get_session_dataset("intervals", session_key)
             logger.debug(f"Found {len(intervals)} interval entries")
             return intervals
         except Exception as e:
@@ -219,7 +891,7 @@ class F1Service:
     async def get_laps(self, session_key: str) -> List[Dict]:
         """Get lap data"""
         try:
-            laps = await self._make_request("laps", {"session_key": session_key})
+            laps = await self._get_session_dataset("laps", session_key)
             logger.debug(f"Found {len(laps)} lap entries")
             return laps
         except Exception as e:
@@ -229,7 +901,7 @@ class F1Service:
     async def get_stints(self, session_key: str) -> List[Dict]:
         """Get stint data"""
         try:
-            stints = await self._make_request("stints", {"session_key": session_key})
+            stints = await self._get_session_dataset("stints", session_key)
             logger.debug(f"Found {len(stints)} stint entries")
             return stints
         except Exception as e:
@@ -239,7 +911,7 @@ class F1Service:
     async def get_pit_data(self, session_key: str) -> List[Dict]:
         """Get pit stop data"""
         try:
-            pit_data = await self._make_request("pit", {"session_key": session_key})
+            pit_data = await self._get_session_dataset("pit", session_key)
             logger.debug(f"Found {len(pit_data)} pit entries")
             return pit_data
         except Exception as e:
@@ -247,15 +919,9 @@ class F1Service:
             return []
 
     async def get_locations(self, session_key: str) -> List[Dict]:
-        """Get car locations - limit to recent data"""
+        """Get car locations from the last 30 seconds"""
         try:
-            # Only get last 30 seconds to avoid huge responses
-            cutoff_time = (datetime.utcnow() - timedelta(seconds=30)).isoformat() + "Z"
-            params = {
-                "session_key": session_key,
-                "date": f">={cutoff_time}"
-            }
-            locations = await self._make_request("location", params)
+            locations = await self._get_session_dataset("location", session_key)
             logger.debug(f"Found {len(locations)} recent location entries")
             return locations
         except Exception as e:
@@ -263,18 +929,11 @@ class F1Service:
             return []
 
     async def get_car_data(self, session_key: str, driver_number: Optional[int] = None) -> List[Dict]:
-        """Get car telemetry data - limited to recent"""
+        """Get car telemetry data from the last 10 seconds"""
         try:
-            # Only get last 10 seconds to avoid rate limits
-            cutoff_time = (datetime.utcnow() - timedelta(seconds=10)).isoformat() + "Z"
-            params = {
-                "session_key": session_key,
-                "date": f">={cutoff_time}"
-            }
+            car_data = await self._get_session_dataset("car_data", session_key)
             if driver_number:
-                params["driver_number"] = driver_number
-                
-            car_data = await self._make_request("car_data", params)
+                car_data = self.datasets.get(session_key, "car_data").driver_rows(driver_number)
             logger.debug(f"Found {len(car_data)} recent car data entries")
             return car_data
         except Exception as e:
@@ -286,81 +945,104 @@ class F1Service:
         try:
             logger.info(f"Getting comprehensive data for session {session_key}")
             
-            # Get data sequentially to avoid overwhelming the API
-            drivers = await self.get_drivers(session_key)
+            # Fan out; the request semaphore and rate limiter bound upstream load
+            drivers, positions, intervals, laps, stints, pit_data = await self.fetch_concurrently(
+                self.get_drivers(session_key),
+                self.sync_dataset("position", session_key),
+                self.sync_dataset("intervals", session_key),
+                self.sync_dataset("laps", session_key),
+                self.sync_dataset("stints", session_key),
+                self.sync_dataset("pit", session_key),
+            )
             if not drivers:
                 return {'driverTimings': [], 'error': 'No drivers found'}
             
-            await asyncio.sleep(0.2)  # Small delay
-            positions = await self.get_positions(session_key)
-            
-            await asyncio.sleep(0.2)
-            intervals = await self.get_intervals(session_key)
-            
-            await asyncio.sleep(0.2)
-            laps = await self.get_laps(session_key)
+            # Apply only what changed since the last call to the session's board
+            aggregate_started = time.perf_counter()
+            board = self._timing_board(session_key, {
+                "position": positions, "intervals": intervals, "laps": laps,
+                "stints": stints, "pit": pit_data,
+            })
+            board.set_drivers(drivers)
+            record_stage('aggregate', time.perf_counter() - aggregate_started)
             
-            await asyncio.sleep(0.2)
-            stints = await self.get_stints(session_key)
+            # Nothing changed since the last response: reuse it
+            version = (board, board.version)
+            previous = self._timing_results.get(session_key)
+            if previous and previous[0] == version:
+                return previous[1]
             
-            await asyncio.sleep(0.2)
-            pit_data = await self.get_pit_data(session_key)
-
-            # Process into driver timings
-            driver_timings = []
-            
-            for driver in drivers:
-                driver_number = driver.get('driver_number')
-                
-                # Get latest data for this driver
-                latest_position = self._get_latest_for_driver(positions, driver_number, 'date')
-                latest_interval = self._get_latest_for_driver(intervals, driver_number, 'date')
-                latest_lap = self._get_latest_for_driver(laps, driver_number, 'lap_number')
-                current_stint = self._get_latest_for_driver(stints, driver_number, 'stint_number')
-                
-                # Count pit stops
-                driver_pit_stops = [p for p in pit_data if p.get('driver_number') == driver_number]
-                
-                timing = {
-                    'driver': driver,
-                    'position': latest_position.get('position') if latest_position else None,
-                    'lapTime': self._format_lap_time(latest_lap.get('lap_duration')) if latest_lap else '--:--.---',
-                    'sector1': self._format_sector_time(latest_lap.get('duration_sector_1')) if latest_lap else '---.---',
-                    'sector2': self._format_sector_time(latest_lap.get('duration_sector_2')) if latest_lap else '---.---',
-                    'sector3': self._format_sector_time(latest_lap.get('duration_sector_3')) if latest_lap else '---.---',
-                    'gap': self._format_gap(latest_interval.get('gap_to_leader')) if latest_interval else '--',
-                    'interval': self._format_gap(latest_interval.get('interval')) if latest_interval else '--',
-                    'lastLap': latest_lap.get('lap_number') if latest_lap else 0,
-                    'tyreCompound': current_stint.get('compound') if current_stint else 'UNKNOWN',
-                    'tyreAge': self._calculate_tyre_age(current_stint, latest_lap) if current_stint and latest_lap else 0,
-                    'pitStops': len(driver_pit_stops)
-                }
-                
-                driver_timings.append(timing)
-            
-            # Sort by position
-            driver_timings.sort(key=lambda x: x.get('position') or 999)
-            
-            return {
-                'driverTimings': driver_timings,
+            timing_data = {
+                'driverTimings': board.driver_timings(),
                 'lastUpdate': datetime.utcnow().isoformat(),
                 'sessionKey': session_key,
                 'totalDrivers': len(drivers)
             }
+            self._timing_results.pop(session_key, None)
+            self._timing_results[session_key] = (version, timing_data)
+            while len(self._timing_results) > self.datasets.max_sessions:
+                self._timing_results.pop(next(iter(self._timing_results)))
+            return timing_data
             
         except Exception as e:
             logger.error(f"Error getting comprehensive timing data: {e}")
             return {'driverTimings': [], 'error': str(e)}
 
-    def _get_latest_for_driver(self, data_list: List[Dict], driver_number: int, sort_key: str) -> Optional[Dict]:
-        """Get the latest entry for a specific driver"""
-        driver_data = [item for item in data_list if item.get('driver_number') == driver_number]
-        if not driver_data:
-            return None
+    async def get_lap_history(self, session_key: str, driver_number: Optional[int] = None,
+                              lap_from: Optional[int] = None, lap_to: Optional[int] = None,
+                              after: Optional[tuple] = None, limit: int = 100) -> Dict:
+        """Get a page of laps, ordered by driver and lap number, with the session's lap statistics"""
+        laps = await self.sync_dataset("laps", session_key)
+        rows, next_key = page_laps(laps.driver_index(), driver_number, lap_from, lap_to, after, limit)
         
-        # Sort by the specified key (date or lap_number, etc.)
-        sorted_data = sorted(driver_data, key=lambda x: x.get(sort_key, ''), reverse=True)
-        return sorted_data[0]
+        statistics = self._get_lap_statistics(session_key, laps)
+        if driver_number is not None:
+            driver_statistics = statistics['drivers'].get(driver_number)
+            statistics = {**statistics, 'drivers': {driver_number: driver_statistics} if driver_statistics else {}}
+        return {'laps': rows, 'next': next_key, 'statistics': statistics}
+
+    def _get_lap_statistics(self, session_key: str, laps) -> Dict:
+        """Get lap statistics for a laps dataset, computed once per version"""
+        cached = self._lap_statistics.pop(session_key, None)
+        if cached is None or cached[0] is not laps or cached[1] != laps.version:
+            cached = (laps, laps.version, compute_lap_statistics(laps.driver_index()))
+        self._lap_statistics[session_key] = cached
+        while len(self._lap_statistics) > self.datasets.max_sessions:
+            self._lap_statistics.pop(next(iter(self._lap_statistics)))
+        return cached[2]
+
+    def _timing_board(self, session_key: str, datasets: Dict) -> TimingBoard:
+        """Get the session's timing board, (re)attaching it if its datasets were replaced"""
+        board = self._timing_boards.pop(session_key, None)
+        if board is None or not board.is_attached_to(datasets):
+            if board is not None:
+                board.detach()
+            board = TimingBoard(self._build_timing_entry)
+            board.attach(datasets)
+        self._timing_boards[session_key] = board
+        while len(self._timing_boards) > self.datasets.max_sessions:
+            self._timing_boards.pop(next(iter(self._timing_boards))).detach()
+        return board
+
+    def _build_timing_entry(self, driver: Dict, latest_position: Optional[Dict], latest_interval: Optional[Dict],
+                            latest_lap: Optional[Dict], current_stint: Optional[Dict], pit_stops: int,
+                            sectors: Dict) -> Dict:
+        """Build one driver's live timing entry from their latest rows"""
+        return {
+            'driver': driver,
+            'position': latest_position.get('position') if latest_position else None,
+            'lapTime': self._format_lap_time(latest_lap.get('lap_duration')) if latest_lap else '--:--.---',
+            'sector1': self._format_sector_time(latest_lap.get('duration_sector_1')) if latest_lap else '---.---',
+            'sector2': self._format_sector_time(latest_lap.get('duration_sector_2')) if latest_lap else '---.---',
+            'sector3': self._format_sector_time(latest_lap.get('duration_sector_3')) if latest_lap else '---.---',
+            'gap': self._format_gap(latest_interval.get('gap_to_leader')) if latest_interval else '--',
+            'interval': self._format_gap(latest_interval.get('interval')) if latest_interval else '--',
+            'lastLap': latest_lap.get('lap_number') if latest_lap else 0,
+            'tyreCompound': current_stint.get('compound') if current_stint else 'UNKNOWN',
+            'tyreAge': self._calculate_tyre_age(current_stint, latest_lap) if current_stint and latest_lap else 0,
+            'pitStops': pit_stops,
+            **sectors
+        }
 
     def _format_lap_time(self, seconds: Optional[float]) -> str:
         """Format lap time from seconds"""
@@ -400,11 +1082,56 @@ class F1Service:
         
         return max(0, current_lap - stint_start + age_at_start)
 
+    def _collect_metrics(self) -> List[tuple]:
+        """Report cache, dataset, limiter and breaker state for /metrics"""
+        cache = self.cache.stats()
+        limiter = self.rate_limiter.stats()
+        return [
+            counter('f1_cache_hits_total', 'Response cache hits', cache['hits']),
+            counter('f1_cache_misses_total', 'Response cache misses', cache['misses']),
+            counter('f1_cache_evictions_total', 'Response cache evictions', cache['evictions']),
+            gauge('f1_cache_entries', 'Response cache entries', cache['entries']),
+            gauge('f1_cache_size_bytes', 'Estimated response cache size', cache['size_bytes']),
+            ('f1_dataset_rows', 'gauge', 'Rows held per session dataset', [
+                ({'session_key': session_key, 'endpoint': endpoint}, rows)
+                for session_key, datasets in self.datasets.stats().items()
+                for endpoint, rows in datasets.items()
+            ]),
+            counter('f1_coalesced_requests_total', 'Requests that joined an in-flight fetch', self.coalesced_requests),
+            counter('f1_background_refreshes_total', 'Stale entries refreshed in the background', self.background_refreshes),
+            counter('f1_upstream_retries_total', 'Upstream attempts retried', self.retries),
+            counter('f1_upstream_hedged_total', 'Upstream attempts hedged', self.hedged_requests),
+            gauge('f1_rate_limiter_queue_depth', 'Requests waiting for a rate limit token', limiter['queue_depth']),
+            counter('f1_rate_limiter_throttled_total', 'Upstream 429 pauses', limiter['throttled']),
+            ('f1_circuit_breaker_open', 'gauge', 'Whether the circuit breaker of an endpoint is open', [
+                ({'endpoint': endpoint}, 0 if breaker['state'] == 'closed' else 1)
+                for endpoint, breaker in self.circuit_breakers.stats().items()
+            ]),
+        ]
+
     def get_health_status(self) -> Dict:
         """Get service health status"""
         return {
             'is_healthy': self.is_healthy,
             'consecutive_failures': self.consecutive_failures,
+            'circuit_breakers': self.circuit_breakers.stats(),
             'cache_entries': len(self.cache),
-            'last_request': self.last_request_time
+            'cache': self.cache.stats(),
+            'datasets': self.datasets.stats(),
+            'timing_boards': {session_key: board.stats() for session_key, board in self._timing_boards.items()},
+            'session_resolver': self.session_resolver.stats(),
+            'json_decoding': dict(self.decode_stats),
+            'last_request': self.rate_limiter.last_acquired_at,
+            'rate_limiter': self.rate_limiter.stats(),
+            'upstream_requests': self.upstream_requests,
+            'retries': self.retries,
+            'hedged_requests': self.hedged_requests,
+            'hedge_wins': self.hedge_wins,
+            'coalesced_requests': self.coalesced_requests,
+            'background_refreshes': self.background_refreshes,
+            'shared_cache': type(self.shared_cache).__name__ if self.shared_cache else None,
+            'shared_hits': self.shared_hits,
+            'shared_waits': self.shared_waits,
+            'shared_compactions': self.shared_compactions,
+            'inflight_requests': len(self._inflight)
         }
\ No newline at end of file
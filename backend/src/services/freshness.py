@@ -0,0 +1,60 @@
+"""
+Freshness Policy - Cache TTLs per OpenF1 endpoint and session state
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+
+from src.utils.helpers import parse_api_datetime
+
+# Session states
+LIVE = "live"
+UPCOMING = "upcoming"
+COMPLETED = "completed"
+UNKNOWN = "unknown"
+
+# OpenF1 keeps publishing late rows for a while after a session ends
+COMPLETED_GRACE = timedelta(minutes=30)
+
+# (soft TTL, hard TTL) in seconds; None means the data never goes stale
+FRESHNESS_POLICY: Dict[str, Dict[str, Tuple[Optional[float], Optional[float]]]] = {
+    'position': {LIVE: (3, 15), UPCOMING: (60, 300), COMPLETED: (None, None)},
+    'intervals': {LIVE: (3, 15), UPCOMING: (60, 300), COMPLETED: (None, None)},
+    'location': {LIVE: (2, 10), UPCOMING: (60, 300), COMPLETED: (None, None)},
+    'car_data': {LIVE: (2, 10), UPCOMING: (60, 300), COMPLETED: (None, None)},
+    'laps': {LIVE: (10, 60), UPCOMING: (60, 300), COMPLETED: (None, None)},
+    'stints': {LIVE: (15, 60), UPCOMING: (60, 300), COMPLETED: (None, None)},
+    'pit': {LIVE: (10, 60), UPCOMING: (60, 300), COMPLETED: (None, None)},
+    'drivers': {LIVE: (300, 3600), UPCOMING: (300, 3600), COMPLETED: (None, None)},
+    'sessions': {LIVE: (300, 3600), UPCOMING: (300, 3600), COMPLETED: (None, None)},
+}
+
+def get_session_state(session: Optional[Dict], now: Optional[datetime] = None,
+                      grace: timedelta = COMPLETED_GRACE) -> str:
+    """Classify a session as live, upcoming or completed from its dates"""
+    if not session:
+        return UNKNOWN
+
+    start_time = parse_api_datetime(session.get('date_start'))
+    end_time = parse_api_datetime(session.get('date_end'))
+    if not start_time or not end_time:
+        return UNKNOWN
+
+    now = now or datetime.now(timezone.utc)
+    if now < start_time:
+        return UPCOMING
+    if now > end_time + grace:
+        return COMPLETED
+    return LIVE
+
+def get_ttls(endpoint: str, state: str, default: Tuple[float, float]) -> Tuple[float, float]:
+    """Get (soft, hard) TTLs in seconds for an endpoint in a session state"""
+    policy = FRESHNESS_POLICY.get(endpoint, {}).get(state)
+    if policy is None:
+        return default
+
+    soft_ttl, hard_ttl = policy
+    return (
+        float('inf') if soft_ttl is None else soft_ttl,
+        float('inf') if hard_ttl is None else hard_ttl
+    )
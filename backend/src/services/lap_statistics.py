@@ -0,0 +1,147 @@
+"""
+Lap Statistics - Vectorized best laps, sectors and rolling averages per session
+"""
+
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from src.services.columnar import ColumnarIndex
+
+SECTOR_FIELDS = ('duration_sector_1', 'duration_sector_2', 'duration_sector_3')
+
+# Laps in each rolling average (pit-out laps are skipped, not counted)
+ROLLING_WINDOW = 5
+
+def _round(value: float) -> Optional[float]:
+    return None if np.isnan(value) else round(float(value), 3)
+
+def _group_minimums(values: np.ndarray, starts: np.ndarray, groups: np.ndarray) -> tuple:
+    """Per-group NaN-ignoring minimum and the position of its first occurrence (-1 if none)"""
+    minimums = np.fmin.reduceat(values, starts)
+    hits = np.flatnonzero(values == minimums[groups])
+    first = np.full(len(starts), -1)
+    hit_groups, hit_index = np.unique(groups[hits], return_index=True)
+    first[hit_groups] = hits[hit_index]
+    return minimums, first
+
+def _rolling_averages(durations: np.ndarray, valid: np.ndarray, groups: np.ndarray, window: int) -> tuple:
+    """Mean of each driver's last `window` valid laps, at every valid lap"""
+    positions = np.flatnonzero(valid)
+    values = durations[positions]
+    value_groups = groups[positions]
+    sums = np.concatenate(([0.0], np.cumsum(values)))
+
+    # Index of each value within its driver's valid laps
+    group_starts = np.searchsorted(value_groups, value_groups, side='left')
+    rank = np.arange(len(values)) - group_starts
+    counts = np.minimum(rank + 1, window)
+    averages = (sums[np.arange(len(values)) + 1] - sums[np.arange(len(values)) + 1 - counts]) / counts
+    return positions, averages
+
+def compute_lap_statistics(index: ColumnarIndex, window: int = ROLLING_WINDOW) -> Dict[str, Any]:
+    """Best laps and sectors, theoretical bests and rolling averages for a laps index"""
+    drivers = index.column('driver_number')
+    if len(drivers) == 0:
+        return {
+            'drivers': {},
+            'session': {'bestLap': None, 'bestSectors': [None, None, None], 'theoreticalBest': None},
+            'rollingWindow': window,
+        }
+
+    lap_numbers = index.column('lap_number')
+    durations = index.column('lap_duration')
+    sectors = [index.column(field) for field in SECTOR_FIELDS]
+    pit_out = index.column('is_pit_out_lap') == 1
+
+    # Rows are ordered by driver, so each driver is a contiguous group
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(drivers)) + 1))
+    lengths = np.diff(np.concatenate((starts, [len(drivers)])))
+    groups = np.repeat(np.arange(len(starts)), lengths)
+
+    best_laps, best_lap_at = _group_minimums(durations, starts, groups)
+    best_sectors = [_group_minimums(values, starts, groups) for values in sectors]
+    theoretical = np.sum([minimums for minimums, _ in best_sectors], axis=0)
+
+    rolling_at, rolling = _rolling_averages(durations, ~np.isnan(durations) & ~pit_out, groups, window)
+    rolling_groups = groups[rolling_at]
+
+    by_driver: Dict[Any, Dict] = {}
+    for group, start in enumerate(starts):
+        driver_number = int(drivers[start])
+        in_group = slice(*np.searchsorted(rolling_groups, [group, group + 1]))
+        series = [
+            {'lap': int(lap_numbers[position]), 'average': round(float(average), 3)}
+            for position, average in zip(rolling_at[in_group], rolling[in_group])
+        ]
+        by_driver[driver_number] = {
+            'lapCount': int(lengths[group]),
+            'bestLap': _lap_record(best_laps[group], best_lap_at[group], lap_numbers),
+            'bestSectors': [_lap_record(minimums[group], at[group], lap_numbers) for minimums, at in best_sectors],
+            'theoreticalBest': _round(theoretical[group]),
+            'rollingAverage': series[-1]['average'] if series else None,
+            'rollingAverages': series,
+        }
+
+    return {
+        'drivers': by_driver,
+        'session': {
+            'bestLap': _session_record(durations, drivers, lap_numbers),
+            'bestSectors': [_session_record(values, drivers, lap_numbers) for values in sectors],
+            'theoreticalBest': _round(np.sum([np.fmin.reduce(values) for values in sectors])),
+        },
+        'rollingWindow': window,
+    }
+
+def _lap_record(duration: float, position: int, lap_numbers: np.ndarray) -> Optional[Dict]:
+    if position < 0 or np.isnan(duration):
+        return None
+    return {'lapNumber': int(lap_numbers[position]), 'duration': _round(duration)}
+
+def _session_record(values: np.ndarray, drivers: np.ndarray, lap_numbers: np.ndarray) -> Optional[Dict]:
+    if np.all(np.isnan(values)):
+        return None
+    position = int(np.nanargmin(values))
+    return {
+        'driverNumber': int(drivers[position]),
+        'lapNumber': int(lap_numbers[position]),
+        'duration': _round(values[position]),
+    }
+
+def page_laps(index: ColumnarIndex, driver_number: Optional[int] = None, lap_from: Optional[int] = None,
+              lap_to: Optional[int] = None, after: Optional[tuple] = None, limit: int = 100) -> tuple:
+    """Select one page of laps ordered by driver and lap number.
+
+    after is the (driver_number, lap_number) of the last lap already
+    returned, so pages stay stable while new laps arrive. Returns the lap
+    rows and the key of the last one if more remain.
+    """
+    drivers = index.column('driver_number')
+    lap_numbers = index.column('lap_number')
+    selected = np.ones(len(drivers), dtype=bool)
+    if driver_number is not None:
+        selected &= drivers == driver_number
+    if lap_from is not None:
+        selected &= lap_numbers >= lap_from
+    if lap_to is not None:
+        selected &= lap_numbers <= lap_to
+    if after is not None:
+        selected &= (drivers > after[0]) | ((drivers == after[0]) & (lap_numbers > after[1]))
+
+    positions = np.flatnonzero(selected)
+    page = positions[:limit]
+    rows: List[Dict] = index.to_dicts(page)
+    next_key = None
+    if len(positions) > limit:
+        last = page[-1]
+        next_key = (int(drivers[last]), int(lap_numbers[last]))
+    return rows, next_key
+
+def format_cursor(key: tuple) -> str:
+    """Encode a (driver_number, lap_number) page key as a cursor"""
+    return f"{key[0]}.{key[1]}"
+
+def parse_cursor(cursor: str) -> tuple:
+    """Decode a cursor; raises ValueError for malformed ones"""
+    driver_number, _, lap_number = cursor.partition('.')
+    return int(driver_number), int(lap_number)
@@ -0,0 +1,152 @@
+"""
+Live Ingestor - Background polling of the current live session
+"""
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from src.services import freshness
+
+logger = logging.getLogger(__name__)
+
+# Seconds between polls of each endpoint while a session is live
+INGEST_CADENCE: Dict[str, float] = {
+    'position': 3,
+    'intervals': 3,
+    'location': 2,
+    'car_data': 2,
+    'laps': 10,
+    'stints': 15,
+    'pit': 10,
+    'drivers': 300,
+}
+
+# How often to check which session is current
+SESSION_CHECK_INTERVAL = 30
+
+class LiveIngestor:
+    def __init__(self, f1_service, cadence: Optional[Dict[str, float]] = None):
+        self.f1_service = f1_service
+        self.cadence = cadence or INGEST_CADENCE
+        self.session_key: Optional[str] = None
+        self.last_polled: Dict[str, float] = {}
+        self.polls = 0
+        self.errors = 0
+        self._listeners: List[Callable[[str, str], Awaitable[None]]] = []
+        self._polling: Dict[str, asyncio.Task] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def add_listener(self, listener: Callable[[str, str], Awaitable[None]]):
+        """Call listener(session_key, endpoint) after each endpoint refresh, e.g. to push updates"""
+        self._listeners.append(listener)
+
+    def start(self):
+        """Start the ingestion loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info("Live ingestor started")
+
+    async def stop(self):
+        """Stop the ingestion loop and hand the session back to on-demand fetching"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for task in self._polling.values():
+            task.cancel()
+        self._set_session(None)
+        logger.info("Live ingestor stopped")
+
+    def _set_session(self, session_key: Optional[str]):
+        """Switch which session is ingested"""
+        if session_key == self.session_key:
+            return
+        if self.session_key is not None:
+            self.f1_service.ingested_sessions.discard(self.session_key)
+            logger.info(f"Stopped ingesting session {self.session_key}")
+        self.session_key = session_key
+        self.last_polled = {}
+        if session_key is not None:
+            self.f1_service.ingested_sessions.add(session_key)
+            logger.info(f"Ingesting live session {session_key}")
+
+    async def _check_session(self):
+        """Ingest the current session only while it is live"""
+        session = await self.f1_service.get_current_session()
+        if session and freshness.get_session_state(session) == freshness.LIVE:
+            self._set_session(str(session['session_key']))
+        else:
+            self._set_session(None)
+
+    async def _poll(self, session_key: str, endpoint: str):
+        """Refresh one endpoint and notify listeners"""
+        try:
+            await self.f1_service.refresh_endpoint(endpoint, session_key)
+            self.polls += 1
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Ingest of {endpoint} failed: {e}")
+            return
+
+        for listener in self._listeners:
+            try:
+                await listener(session_key, endpoint)
+            except Exception as e:
+                logger.error(f"Ingest listener failed: {e}")
+
+    async def _run(self):
+        """Poll each endpoint of the live session at its own cadence"""
+        next_session_check = 0.0
+        while True:
+            try:
+                now = time.monotonic()
+                if now >= next_session_check:
+                    await self._check_session()
+                    next_session_check = now + SESSION_CHECK_INTERVAL
+
+                if self.session_key is None:
+                    await asyncio.sleep(max(0.0, next_session_check - time.monotonic()))
+                    continue
+
+                # Each endpoint polls independently, so a slow one does not hold up the rest
+                now = time.monotonic()
+                for endpoint, interval in self.cadence.items():
+                    if endpoint in self._polling:
+                        continue
+                    if now - self.last_polled.get(endpoint, float('-inf')) >= interval:
+                        self.last_polled[endpoint] = now
+                        task = asyncio.create_task(self._poll(self.session_key, endpoint))
+                        self._polling[endpoint] = task
+                        task.add_done_callback(lambda _, endpoint=endpoint: self._polling.pop(endpoint, None))
+
+                # Sleep until the next endpoint (or session check) is due
+                next_due = min(
+                    [self.last_polled.get(endpoint, now) + interval for endpoint, interval in self.cadence.items()]
+                    + [next_session_check]
+                )
+                await asyncio.sleep(max(0.05, next_due - time.monotonic()))
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Live ingestor error: {e}")
+                await asyncio.sleep(1)
+
+    def stats(self) -> Dict:
+        """Get ingestor state for health reporting"""
+        now = time.monotonic()
+        return {
+            'running': self._task is not None,
+            'session_key': self.session_key,
+            'polls': self.polls,
+            'errors': self.errors,
+            'endpoint_age': {
+                endpoint: round(now - polled, 1) for endpoint, polled in self.last_polled.items()
+            }
+        }
@@ -0,0 +1,124 @@
+"""
+Metrics - Counters and histograms rendered in Prometheus text format
+"""
+
+import bisect
+import math
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Default latency buckets in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Starlette appends the charset to text/ media types
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+# (name, type, help, [(labels, value), ...]) reported by a collector at scrape time
+Family = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+class MetricsRegistry:
+    """Process-local metrics.
+
+    Counters and histograms are updated as things happen; gauges and
+    counters that components already keep in their stats() are read by
+    collectors when /metrics is scraped, so they cost nothing in between.
+    """
+
+    def __init__(self):
+        self._help: Dict[str, Tuple[str, str]] = {}
+        self._counters: Dict[str, Dict[Tuple, float]] = {}
+        self._histograms: Dict[str, Dict[Tuple, Histogram]] = {}
+        self._collectors: List[Callable[[], Iterable[Family]]] = []
+
+    def counter(self, name: str, help_text: str):
+        self._help[name] = ("counter", help_text)
+        self._counters.setdefault(name, {})
+
+    def histogram(self, name: str, help_text: str):
+        self._help[name] = ("histogram", help_text)
+        self._histograms.setdefault(name, {})
+
+    def inc(self, name: str, value: float = 1.0, **labels: str):
+        series = self._counters[name]
+        key = tuple(sorted(labels.items()))
+        series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, **labels: str):
+        series = self._histograms[name]
+        key = tuple(sorted(labels.items()))
+        histogram = series.get(key)
+        if histogram is None:
+            histogram = series[key] = Histogram()
+        histogram.observe(value)
+
+    def add_collector(self, collector: Callable[[], Iterable[Family]]):
+        """Register a callable returning metric families to report at scrape time"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Render every metric in Prometheus text exposition format"""
+        lines: List[str] = []
+
+        for name, series in self._counters.items():
+            lines += self._header(name, *self._help[name])
+            for key, value in series.items():
+                lines.append(f"{name}{_format_labels(dict(key))} {_format_value(value)}")
+
+        for name, series in self._histograms.items():
+            lines += self._header(name, *self._help[name])
+            for key, histogram in series.items():
+                labels = dict(key)
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_format_labels({**labels, 'le': _format_value(bound)})} {cumulative}")
+                lines.append(f"{name}_bucket{_format_labels({**labels, 'le': '+Inf'})} {histogram.count}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(histogram.sum)}")
+                lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+
+        for collector in self._collectors:
+            for name, metric_type, help_text, samples in collector():
+                lines += self._header(name, metric_type, help_text)
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+    def _header(self, name: str, metric_type: str, help_text: str) -> List[str]:
+        return [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+
+def gauge(name: str, help_text: str, value: Optional[float], labels: Optional[Dict[str, str]] = None) -> Family:
+    """A single-sample gauge family for collectors"""
+    return (name, "gauge", help_text, [(labels or {}, value or 0.0)])
+
+def counter(name: str, help_text: str, value: Optional[float], labels: Optional[Dict[str, str]] = None) -> Family:
+    """A single-sample counter family for collectors"""
+    return (name, "counter", help_text, [(labels or {}, value or 0.0)])
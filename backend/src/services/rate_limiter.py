@@ -0,0 +1,107 @@
+"""
+Rate Limiter - Async token bucket for upstream OpenF1 requests
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+def parse_retry_after(value: Optional[str], default: float = 5.0) -> float:
+    """Parse a Retry-After header given as seconds or an HTTP date"""
+    if not value:
+        return default
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+class TokenBucketRateLimiter:
+    def __init__(self, rate: float = 3.0, burst: int = 3):
+        self.rate = rate  # tokens per second
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+
+        # asyncio.Lock wakes waiters in FIFO order, which keeps the queue fair
+        self._lock = asyncio.Lock()
+
+        # Metrics
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.acquired = 0
+        self.throttled = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.last_acquired_at = 0.0
+
+    def _refill(self, now: float):
+        """Add tokens earned since the last update"""
+        elapsed = now - self._updated_at
+        self._tokens = min(float(self.burst), self._tokens + elapsed * self.rate)
+        self._updated_at = now
+
+    async def acquire(self) -> float:
+        """Wait for a token; returns the time spent waiting in seconds"""
+        started = time.monotonic()
+        self.queue_depth += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+
+        try:
+            async with self._lock:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+
+                    delay = self._paused_until - now
+                    if delay <= 0:
+                        if self._tokens >= 1:
+                            self._tokens -= 1
+                            break
+                        delay = (1 - self._tokens) / self.rate
+
+                    await asyncio.sleep(delay)
+        finally:
+            self.queue_depth -= 1
+
+        waited = time.monotonic() - started
+        self.acquired += 1
+        self.total_wait_time += waited
+        self.max_wait_time = max(self.max_wait_time, waited)
+        self.last_acquired_at = datetime.now().timestamp()
+        return waited
+
+    def pause(self, seconds: float):
+        """Hold back all requests, e.g. after a 429 with Retry-After"""
+        self.throttled += 1
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0.0
+        logger.warning(f"Upstream requests paused for {seconds:.1f}s")
+
+    def stats(self) -> Dict:
+        """Get limiter metrics"""
+        return {
+            'rate': self.rate,
+            'burst': self.burst,
+            'queue_depth': self.queue_depth,
+            'max_queue_depth': self.max_queue_depth,
+            'acquired': self.acquired,
+            'throttled': self.throttled,
+            'avg_wait_time': round(self.total_wait_time / self.acquired, 4) if self.acquired else 0.0,
+            'max_wait_time': round(self.max_wait_time, 4),
+            'paused_for': round(max(0.0, self._paused_until - time.monotonic()), 2)
+        }
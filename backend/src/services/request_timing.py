@@ -0,0 +1,57 @@
+"""
+Request Timing - Per-stage durations of a request for Server-Timing headers
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+# Stages in the order they are reported, with their Server-Timing descriptions
+STAGES = {
+    'session': 'session resolution',
+    'ratelimit': 'rate limiter wait',
+    'upstream': 'OpenF1 I/O',
+    'parse': 'JSON parsing',
+    'aggregate': 'timing aggregation',
+    'encode': 'response encoding',
+}
+
+# Stage durations (seconds) of the current request, if it is being timed
+_stage_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar('f1_stage_timings', default=None)
+
+def track_request_timing() -> Dict[str, float]:
+    """Start recording stage timings for the current request context"""
+    timings: Dict[str, float] = {}
+    _stage_timings.set(timings)
+    return timings
+
+def record_stage(stage: str, seconds: float):
+    """Add time spent in a stage; a no-op when the request is not being timed.
+
+    Concurrent work (e.g. fanned-out upstream requests) adds up, so a
+    stage can exceed the request's wall time.
+    """
+    timings = _stage_timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+@contextmanager
+def timed_stage(stage: str) -> Iterator[None]:
+    """Record the time spent in a block as a stage"""
+    if _stage_timings.get() is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - started)
+
+def format_server_timing(timings: Dict[str, float], total: float) -> str:
+    """Format stage timings as a Server-Timing header value (milliseconds)"""
+    ordered = [stage for stage in STAGES if stage in timings]
+    ordered += [stage for stage in timings if stage not in STAGES]
+    entries = [f'{stage};desc="{STAGES.get(stage, stage)}";dur={timings[stage] * 1000:.2f}' for stage in ordered]
+    entries.append(f'total;dur={total * 1000:.2f}')
+    return ", ".join(entries)
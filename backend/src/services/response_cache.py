@@ -0,0 +1,112 @@
+"""
+Response Cache - Bounded LRU cache for upstream responses with a byte budget
+"""
+
+import logging
+import sys
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Any
+
+logger = logging.getLogger(__name__)
+
+# Rows sampled per response when estimating its size
+SIZE_SAMPLE_ROWS = 20
+
+def estimate_rows_size(rows: List[Any]) -> int:
+    """Estimate the memory held by a list of response rows, in bytes"""
+    size = sys.getsizeof(rows)
+    if not rows:
+        return size
+
+    # Rows of one endpoint share a shape, so a small sample is representative
+    step = max(1, len(rows) // SIZE_SAMPLE_ROWS)
+    sample = rows[::step][:SIZE_SAMPLE_ROWS]
+    sample_size = 0
+    for row in sample:
+        sample_size += sys.getsizeof(row)
+        if isinstance(row, dict):
+            sample_size += sum(sys.getsizeof(value) for value in row.values())
+
+    return size + sample_size * len(rows) // len(sample)
+
+class ResponseCache:
+    def __init__(self, max_entries: int = 2048, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+
+        # Counters
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Look up an entry, marking it as recently used"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry
+
+    def peek(self, key: str) -> Optional[Dict]:
+        """Look up an entry without touching LRU order or counters"""
+        return self._entries.get(key)
+
+    def set(self, key: str, data: List[Dict], timestamp: Optional[datetime] = None):
+        """Store a response, evicting least recently used entries to fit"""
+        size = estimate_rows_size(data)
+        self.pop(key)
+
+        if size > self.max_bytes:
+            logger.debug(f"Not caching {key}: {size} bytes exceeds cache budget")
+            return
+
+        self._entries[key] = {
+            'data': data,
+            'timestamp': timestamp or datetime.now(),
+            'size': size
+        }
+        self.size_bytes += size
+
+        while len(self._entries) > self.max_entries or self.size_bytes > self.max_bytes:
+            evicted_key, evicted = self._entries.popitem(last=False)
+            self.size_bytes -= evicted['size']
+            self.evictions += 1
+            logger.debug(f"Evicted {evicted_key} from cache")
+
+    def pop(self, key: str) -> Optional[Dict]:
+        """Remove an entry if present"""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size_bytes -= entry['size']
+        return entry
+
+    def clear(self):
+        """Remove all entries"""
+        self._entries.clear()
+        self.size_bytes = 0
+
+    def stats(self) -> Dict:
+        """Get cache counters"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'size_bytes': self.size_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 3) if lookups else 0.0,
+            'evictions': self.evictions
+        }
@@ -0,0 +1,79 @@
+"""
+Sector Tracker - Session-best and personal-best lap and sector state, kept from new laps rows
+"""
+
+from typing import Any, Dict, List, Optional, Set
+
+# Timed parts of a lap, as reported in laps rows
+TIMED_FIELDS = ('lap_duration', 'duration_sector_1', 'duration_sector_2', 'duration_sector_3')
+SEGMENT_FIELDS = ('segments_sector_1', 'segments_sector_2', 'segments_sector_3')
+
+# States, named after the frontend's SECTOR_COLORS keys
+SESSION_BEST = 'SESSION_BEST'
+PERSONAL_BEST = 'PERSONAL_BEST'
+SLOWER = 'SLOWER'
+
+# OpenF1 mini-sector codes; anything else (0, pit lane) has no state
+SEGMENT_STATES = {2048: SLOWER, 2049: PERSONAL_BEST, 2051: SESSION_BEST}
+
+# Times within this of a best count as matching it (timing is to the millisecond)
+TOLERANCE = 0.001
+
+class SectorTracker:
+    """Best lap and sector times of a session, updated one laps row at a time.
+
+    apply() returns the drivers whose displayed state may have changed:
+    the drivers of the rows, plus the drivers shown as session best in a
+    field whose session best was just beaten. Everyone else keeps their
+    state, so the cost of an update does not grow with the session.
+    """
+
+    def __init__(self):
+        self.session_best: Dict[str, float] = {}
+        self.personal_best: Dict[Any, Dict[str, float]] = {}
+        # Drivers whose latest lap currently shows session best, per field
+        self._session_best_shown: Dict[str, Set[Any]] = {field: set() for field in TIMED_FIELDS}
+
+    def apply(self, rows: List[Dict]) -> Set[Any]:
+        """Take new or changed laps rows into the bests"""
+        affected = set()
+        for row in rows:
+            driver_number = row.get('driver_number')
+            affected.add(driver_number)
+            personal = self.personal_best.setdefault(driver_number, {})
+            for field in TIMED_FIELDS:
+                value = row.get(field)
+                if not value or value <= 0:
+                    continue
+                if field not in personal or value < personal[field]:
+                    personal[field] = value
+                if field not in self.session_best or value < self.session_best[field]:
+                    self.session_best[field] = value
+                    affected |= self._session_best_shown[field]
+        return affected
+
+    def _field_state(self, driver_number: Any, field: str, value: Optional[float]) -> Optional[str]:
+        shown = self._session_best_shown[field]
+        if not value or value <= 0:
+            shown.discard(driver_number)
+            return None
+        if value <= self.session_best.get(field, value) + TOLERANCE:
+            shown.add(driver_number)
+            return SESSION_BEST
+        shown.discard(driver_number)
+        if value <= self.personal_best.get(driver_number, {}).get(field, value) + TOLERANCE:
+            return PERSONAL_BEST
+        return SLOWER
+
+    def state(self, driver_number: Any, lap: Optional[Dict]) -> Dict:
+        """States of a driver's lap, its sectors and their mini-sectors"""
+        lap = lap or {}
+        states = [self._field_state(driver_number, field, lap.get(field)) for field in TIMED_FIELDS]
+        return {
+            'lapStatus': states[0],
+            'sectorStatus': states[1:],
+            'miniSectors': [
+                [SEGMENT_STATES.get(code) for code in lap.get(field) or []]
+                for field in SEGMENT_FIELDS
+            ],
+        }
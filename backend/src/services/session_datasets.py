@@ -0,0 +1,395 @@
+"""
+Session Datasets - Incrementally synced per-session OpenF1 data and
+sliding-window buffers for high-volume telemetry
+"""
+
+import heapq
+import logging
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Deque, Dict, List, Optional, Any, Set, Tuple
+
+from src.services.columnar import COLUMNAR_SCHEMAS, ColumnarIndex, ColumnarTable
+from src.utils.helpers import parse_api_datetime, format_api_datetime
+
+logger = logging.getLogger(__name__)
+
+# How each growing endpoint is synced: the field used as a high-water mark,
+# how far behind it to re-fetch (rows that arrive late or are still being
+# filled in), the fields that identify a row for de-duplication, and the
+# field that orders a driver's rows (the last one is the latest). Endpoints
+# without a cursor are re-fetched whole on every sync.
+INCREMENTAL_ENDPOINTS: Dict[str, Dict[str, Any]] = {
+    'position': {'cursor': 'date', 'overlap': timedelta(seconds=5), 'key': ('driver_number', 'date'), 'order': 'date'},
+    'intervals': {'cursor': 'date', 'overlap': timedelta(seconds=5), 'key': ('driver_number', 'date'), 'order': 'date'},
+    'pit': {'cursor': 'date', 'overlap': timedelta(seconds=60), 'key': ('driver_number', 'lap_number'), 'order': 'lap_number'},
+    'laps': {'cursor': 'date_start', 'overlap': timedelta(minutes=5), 'key': ('driver_number', 'lap_number'), 'order': 'lap_number'},
+    # A session-wide lap_end cursor follows the leader, so a lapped car's new
+    # stint would fall behind it; stints are a few dozen rows, fetch them all
+    'stints': {'cursor': None, 'overlap': None, 'key': ('driver_number', 'stint_number'), 'order': 'stint_number'},
+}
+
+# High-volume endpoints kept only as a recent window per driver
+WINDOWED_ENDPOINTS: Dict[str, timedelta] = {
+    'location': timedelta(seconds=30),
+    'car_data': timedelta(seconds=10),
+}
+
+# How far behind the latest buffered row to re-fetch windowed endpoints:
+# drivers' rows are published a few seconds apart, so one driver's rows
+# can arrive after a later row of another
+WINDOW_OVERLAP = timedelta(seconds=5)
+
+class DriverIndex:
+    """A dataset's rows grouped by driver, each driver's rows in order"""
+
+    def __init__(self, rows: List[Dict], order_field: str):
+        self._by_driver: Dict[Any, List[Dict]] = {}
+        for row in rows:
+            driver_rows = self._by_driver.get(row.get('driver_number'))
+            if driver_rows is None:
+                driver_rows = self._by_driver[row.get('driver_number')] = []
+            driver_rows.append(row)
+
+        # Rows mostly arrive in order, so these sorts are close to linear
+        def order(row: Dict) -> Tuple:
+            value = row.get(order_field)
+            return (value is not None, value if value is not None else 0)
+        for driver_rows in self._by_driver.values():
+            driver_rows.sort(key=order)
+
+    def drivers(self) -> List[Any]:
+        return list(self._by_driver)
+
+    def rows(self, driver_number: Any) -> List[Dict]:
+        """One driver's rows, oldest first"""
+        return self._by_driver.get(driver_number, [])
+
+    def latest(self, driver_number: Any) -> Optional[Dict]:
+        """One driver's latest row"""
+        driver_rows = self._by_driver.get(driver_number)
+        return driver_rows[-1] if driver_rows else None
+
+    def count(self, driver_number: Any) -> int:
+        return len(self._by_driver.get(driver_number, ()))
+
+class SessionDataset:
+    def __init__(self, endpoint: str):
+        spec = INCREMENTAL_ENDPOINTS[endpoint]
+        self.endpoint = endpoint
+        self.cursor_field: Optional[str] = spec['cursor']
+        self.overlap = spec['overlap']
+        self.key_fields: Tuple[str, ...] = spec['key']
+        self.order_field: str = spec['order']
+
+        # Rows in arrival order; updated rows are replaced in place
+        self._rows: List[Dict] = []
+        self._positions: Dict[Tuple, int] = {}
+        self.cursor: Optional[Any] = None
+        self.fetched_at: Optional[datetime] = None
+        self.version = 0
+        self.log_position = 0  # how far the shared sync log has been replayed
+        self._driver_index: Optional[Tuple[int, DriverIndex]] = None
+        self._listeners: List[Callable[[str, List[Dict]], None]] = []
+
+    def reset(self):
+        """Drop all rows and the cursor, e.g. before restoring a snapshot; listeners stay"""
+        self._rows = []
+        self._positions = {}
+        self.cursor = None
+        self.fetched_at = None
+        self.version += 1
+
+    def add_listener(self, listener: Callable[[str, List[Dict]], None]):
+        """Call listener(endpoint, rows) with the new or changed rows of each merge"""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[str, List[Dict]], None]):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _cursor_value(self, row: Dict) -> Optional[Any]:
+        """Get the comparable high-water mark value of a row"""
+        if self.cursor_field is None:
+            return None
+        value = row.get(self.cursor_field)
+        if isinstance(value, str):
+            return parse_api_datetime(value)
+        return value
+
+    def cursor_params(self) -> Dict:
+        """Query filters that fetch only rows at or after the cursor"""
+        if self.cursor_field is None or self.cursor is None:
+            return {}
+
+        since = self.cursor - self.overlap
+        if isinstance(since, datetime):
+            since = format_api_datetime(since)
+        return {self.cursor_field: f">={since}"}
+
+    @property
+    def rows(self) -> List[Dict]:
+        """All rows in arrival order"""
+        return self._rows
+
+    def row_count(self) -> int:
+        return len(self._rows)
+
+    def _get_row(self, position: int) -> Dict:
+        return self._rows[position]
+
+    def _append_row(self, row: Dict) -> int:
+        self._rows.append(row)
+        return len(self._rows) - 1
+
+    def _replace_row(self, position: int, row: Dict):
+        self._rows[position] = row
+
+    def merge(self, rows: List[Dict], fetched_at: Optional[datetime] = None) -> int:
+        """Merge fetched rows, returning how many were new or changed"""
+        changed_rows = []
+        for row in rows:
+            key = tuple(row.get(field) for field in self.key_fields)
+            position = self._positions.get(key)
+            if position is None:
+                self._positions[key] = self._append_row(row)
+                changed_rows.append(row)
+            elif self._get_row(position) != row:
+                self._replace_row(position, row)
+                changed_rows.append(row)
+
+            value = self._cursor_value(row)
+            if value is not None and (self.cursor is None or value > self.cursor):
+                self.cursor = value
+
+        # Syncs replayed from other workers keep their own fetch time
+        fetched_at = fetched_at or datetime.now()
+        if self.fetched_at is None or fetched_at > self.fetched_at:
+            self.fetched_at = fetched_at
+        if changed_rows:
+            self.version += 1
+            for listener in self._listeners:
+                listener(self.endpoint, changed_rows)
+        return len(changed_rows)
+
+    def driver_index(self) -> DriverIndex:
+        """Rows grouped by driver, built once per version"""
+        if self._driver_index is None or self._driver_index[0] != self.version:
+            self._driver_index = (self.version, DriverIndex(self.rows, self.order_field))
+        return self._driver_index[1]
+
+    def age(self) -> Optional[float]:
+        """Seconds since the last successful sync, or None if never synced"""
+        if self.fetched_at is None:
+            return None
+        return (datetime.now() - self.fetched_at).total_seconds()
+
+class ColumnarDataset(SessionDataset):
+    """A session dataset held as NumPy columns instead of row dicts.
+
+    Only rows still inside the re-fetch overlap can come back from a sync,
+    so only their keys are kept for de-duplication; older rows exist only
+    as column values. rows converts the whole dataset back to dicts, so
+    hot paths read driver_index() or the table columns instead.
+    """
+
+    def __init__(self, endpoint: str):
+        super().__init__(endpoint)
+        self.table = ColumnarTable(COLUMNAR_SCHEMAS[endpoint])
+        self._key_cursors: Dict[Tuple, Optional[Any]] = {}
+        self._keys_after_forget = 64
+
+    def reset(self):
+        super().reset()
+        self.table = ColumnarTable(COLUMNAR_SCHEMAS[self.endpoint])
+        self._key_cursors = {}
+        self._keys_after_forget = 64
+
+    @property
+    def rows(self) -> List[Dict]:
+        return self.table.to_dicts()
+
+    def row_count(self) -> int:
+        return self.table.size
+
+    def _get_row(self, position: int) -> Dict:
+        return self.table.row(position)
+
+    def _append_row(self, row: Dict) -> int:
+        return self.table.append(row)
+
+    def _replace_row(self, position: int, row: Dict):
+        self.table.update(position, row)
+
+    def merge(self, rows: List[Dict], fetched_at: Optional[datetime] = None) -> int:
+        changed = super().merge(rows, fetched_at)
+        for row in rows:
+            self._key_cursors[tuple(row.get(field) for field in self.key_fields)] = self._cursor_value(row)
+        self._forget_settled_keys()
+        return changed
+
+    def _forget_settled_keys(self):
+        """Drop de-duplication keys of rows older than the next sync can return"""
+        # Amortized: only scan once the key count has doubled since the last scan
+        if self.cursor is None or len(self._key_cursors) < 2 * self._keys_after_forget:
+            return
+        since = self.cursor - self.overlap
+        for key, value in list(self._key_cursors.items()):
+            if value is not None and value < since:
+                del self._key_cursors[key]
+                del self._positions[key]
+        self._keys_after_forget = max(len(self._key_cursors), 64)
+
+    def driver_index(self) -> ColumnarIndex:
+        """Columns ordered by driver, built once per version"""
+        if self._driver_index is None or self._driver_index[0] != self.version:
+            self._driver_index = (self.version, ColumnarIndex(self.table, self.order_field))
+        return self._driver_index[1]
+
+class SlidingWindowBuffer:
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.window = WINDOWED_ENDPOINTS[endpoint]
+        self.overlap = WINDOW_OVERLAP
+
+        # Per-driver rows ordered by date, plus the dates held for de-duplication
+        self._by_driver: Dict[Any, Deque[Tuple[datetime, Dict]]] = {}
+        self._dates: Dict[Any, Set[datetime]] = {}
+        self._rows: Optional[List[Dict]] = None
+        self.latest: Optional[datetime] = None
+        self.fetched_at: Optional[datetime] = None
+        self.version = 0
+        self.log_position = 0  # how far the shared sync log has been replayed
+
+    def reset(self):
+        """Drop all buffered rows, e.g. before restoring a snapshot"""
+        self._by_driver = {}
+        self._dates = {}
+        self._rows = None
+        self.latest = None
+        self.fetched_at = None
+        self.version += 1
+
+    def cursor_params(self) -> Dict:
+        """Query filter from just before the last seen row, or the start of the window"""
+        since = datetime.now(timezone.utc) - self.window
+        if self.latest is not None and self.latest - self.overlap > since:
+            since = self.latest - self.overlap
+        return {'date': f">={format_api_datetime(since)}"}
+
+    def merge(self, rows: List[Dict], fetched_at: Optional[datetime] = None) -> int:
+        """Add fetched rows, skipping ones already buffered"""
+        changed = 0
+        for row in rows:
+            timestamp = parse_api_datetime(row.get('date'))
+            if timestamp is None:
+                continue
+
+            driver_number = row.get('driver_number')
+            dates = self._dates.setdefault(driver_number, set())
+            if timestamp in dates:
+                continue
+            dates.add(timestamp)
+
+            buffer = self._by_driver.setdefault(driver_number, deque())
+            if not buffer or timestamp >= buffer[-1][0]:
+                buffer.append((timestamp, row))
+            else:
+                # Out-of-order row: insert from the end, where it almost always belongs
+                position = len(buffer)
+                while position > 0 and buffer[position - 1][0] > timestamp:
+                    position -= 1
+                buffer.insert(position, (timestamp, row))
+            changed += 1
+
+            if self.latest is None or timestamp > self.latest:
+                self.latest = timestamp
+
+        # Syncs replayed from other workers keep their own fetch time
+        fetched_at = fetched_at or datetime.now()
+        if self.fetched_at is None or fetched_at > self.fetched_at:
+            self.fetched_at = fetched_at
+        if changed:
+            self._rows = None
+            self.version += 1
+        self._trim()
+        return changed
+
+    def _trim(self):
+        """Drop rows that have fallen out of the window.
+
+        Only merges trim, so the rows and version change with syncs rather
+        than on every read, and cached responses stay valid between syncs.
+        """
+        cutoff = datetime.now(timezone.utc) - self.window
+        trimmed = False
+        for driver_number in list(self._by_driver):
+            buffer = self._by_driver[driver_number]
+            while buffer and buffer[0][0] < cutoff:
+                timestamp, _ = buffer.popleft()
+                self._dates[driver_number].discard(timestamp)
+                trimmed = True
+            if not buffer:
+                del self._by_driver[driver_number]
+                del self._dates[driver_number]
+
+        if trimmed:
+            self._rows = None
+            self.version += 1
+
+    @property
+    def rows(self) -> List[Dict]:
+        """All buffered rows in date order, as of the last sync"""
+        if self._rows is None:
+            merged = heapq.merge(*self._by_driver.values(), key=lambda item: item[0])
+            self._rows = [row for _, row in merged]
+        return self._rows
+
+    def row_count(self) -> int:
+        return sum(len(buffer) for buffer in self._by_driver.values())
+
+    def driver_rows(self, driver_number: Any) -> List[Dict]:
+        """Buffered rows for one driver in date order"""
+        return [row for _, row in self._by_driver.get(driver_number, ())]
+
+    def age(self) -> Optional[float]:
+        """Seconds since the last successful sync, or None if never synced"""
+        if self.fetched_at is None:
+            return None
+        return (datetime.now() - self.fetched_at).total_seconds()
+
+class SessionDatasetStore:
+    def __init__(self, max_sessions: int = 4):
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, Dict[str, SessionDataset]]" = OrderedDict()
+
+    def get(self, session_key: str, endpoint: str):
+        """Get (or create) the dataset for a session endpoint"""
+        session_key = str(session_key)
+        datasets = self._sessions.get(session_key)
+        if datasets is None:
+            datasets = self._sessions[session_key] = {}
+            while len(self._sessions) > self.max_sessions:
+                evicted_key, _ = self._sessions.popitem(last=False)
+                logger.info(f"Dropped datasets for session {evicted_key}")
+        self._sessions.move_to_end(session_key)
+
+        if endpoint not in datasets:
+            if endpoint in WINDOWED_ENDPOINTS:
+                datasets[endpoint] = SlidingWindowBuffer(endpoint)
+            elif endpoint in COLUMNAR_SCHEMAS:
+                datasets[endpoint] = ColumnarDataset(endpoint)
+            else:
+                datasets[endpoint] = SessionDataset(endpoint)
+        return datasets[endpoint]
+
+    def peek(self, session_key: str, endpoint: str):
+        """Get an existing dataset without creating it or touching LRU order"""
+        return self._sessions.get(str(session_key), {}).get(endpoint)
+
+    def stats(self) -> Dict:
+        """Get row counts per session and endpoint"""
+        return {
+            session_key: {endpoint: dataset.row_count() for endpoint, dataset in datasets.items()}
+            for session_key, datasets in self._sessions.items()
+        }
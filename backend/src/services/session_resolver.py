@@ -0,0 +1,108 @@
+"""
+Session Resolver - Keeps the current session in memory for "latest" routes
+"""
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+from src.utils.helpers import parse_api_datetime
+
+logger = logging.getLogger(__name__)
+
+# OpenF1 switches "latest" shortly after a session boundary, so check a little late
+BOUNDARY_LAG = 5
+
+# Between sessions a new one can be published at any time
+IDLE_REFRESH_INTERVAL = 60
+
+# Even mid-session, pick up changed session dates now and then
+MAX_REFRESH_INTERVAL = 900
+
+# Retry sooner after a failed lookup
+FAILED_REFRESH_INTERVAL = 10
+
+class SessionResolver:
+    """Resolve the current session without touching upstream on the request path.
+
+    The first lookup waits for fetch(); after that callers get the session
+    held in memory, and a background refresh is started once the next
+    refresh time passes. Refresh times follow the session's date_start and
+    date_end, so the held session switches soon after a boundary.
+    """
+
+    def __init__(self, fetch: Callable[[], Awaitable[Optional[Dict]]],
+                 idle_interval: float = IDLE_REFRESH_INTERVAL):
+        self.fetch = fetch
+        self.idle_interval = idle_interval
+        self.session: Optional[Dict] = None
+        self.refresh_at = 0.0
+        self.refreshes = 0
+        self.switches = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def get(self) -> Optional[Dict]:
+        """Get the current session, refreshing it in the background when due"""
+        if self.session is not None:
+            if time.time() >= self.refresh_at and self._task is None:
+                self._start_refresh()
+            return self.session
+
+        # Nothing held yet; concurrent callers share one lookup, and after a
+        # failed or empty one, wait until the retry time before trying again
+        if self._task is None and time.time() < self.refresh_at:
+            return None
+        task = self._task or self._start_refresh()
+        return await asyncio.shield(task)
+
+    def _start_refresh(self) -> asyncio.Task:
+        """Start the single lookup of the current session"""
+        task = asyncio.ensure_future(self._refresh())
+        self._task = task
+        task.add_done_callback(lambda _: setattr(self, '_task', None))
+        return task
+
+    async def _refresh(self) -> Optional[Dict]:
+        """Look up the current session and schedule the next lookup"""
+        self.refreshes += 1
+        try:
+            session = await self.fetch()
+        except Exception as e:
+            logger.error(f"Error resolving current session: {e}")
+            session = None
+
+        now = time.time()
+        if not session:
+            self.refresh_at = now + FAILED_REFRESH_INTERVAL
+            return self.session
+
+        if self.session is None or self.session.get('session_key') != session.get('session_key'):
+            self.switches += 1
+            logger.info(f"Current session: {session.get('session_name')} at "
+                        f"{session.get('circuit_short_name')} ({session.get('session_key')})")
+        self.session = session
+        self.refresh_at = self._next_refresh(session, now)
+        return session
+
+    def _next_refresh(self, session: Dict, now: float) -> float:
+        """Schedule the next lookup at the session's next boundary"""
+        boundaries = [
+            boundary.timestamp() + BOUNDARY_LAG
+            for boundary in (parse_api_datetime(session.get('date_start')),
+                             parse_api_datetime(session.get('date_end')))
+            if boundary is not None and boundary.timestamp() + BOUNDARY_LAG > now
+        ]
+        if not boundaries:
+            # Session is over; keep watching for the next one
+            return now + self.idle_interval
+        return min(min(boundaries), now + MAX_REFRESH_INTERVAL)
+
+    def stats(self) -> Dict:
+        """Get resolver state for health reporting"""
+        return {
+            'session_key': self.session.get('session_key') if self.session else None,
+            'refresh_in': round(max(0.0, self.refresh_at - time.time()), 1),
+            'refreshes': self.refreshes,
+            'switches': self.switches
+        }
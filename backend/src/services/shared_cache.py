@@ -0,0 +1,383 @@
+"""
+Shared Cache - Cross-worker cache backends so uvicorn workers share upstream data
+"""
+
+import abc
+import asyncio
+import fcntl
+import hashlib
+import logging
+import os
+import tempfile
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Log files and snapshots start with the log position they begin at, as "%020d\n"
+POSITION_HEADER = 21
+
+class LogCompacted(Exception):
+    """The records after a log position were compacted into a snapshot.
+
+    start is where the retained log now begins; readers restore the
+    snapshot and continue from its position (or from start if there is
+    no snapshot).
+    """
+
+    def __init__(self, start: int):
+        super().__init__(f"log now starts at {start}")
+        self.start = start
+
+def _pack_position(position: int, data: bytes) -> bytes:
+    return b"%020d\n" % position + data
+
+def _unpack_position(data: bytes) -> Optional[Tuple[bytes, int]]:
+    """Split a position header from its data; None if the header is incomplete"""
+    if len(data) < POSITION_HEADER:
+        return None
+    return data[POSITION_HEADER:], int(data[:POSITION_HEADER])
+
+class SharedCache(abc.ABC):
+    """Store shared by all worker processes.
+
+    Values hold whole cached responses; logs are lists of records used to
+    replay incremental dataset syncs in every worker, compacted now and
+    then into a snapshot so they stay short; refresh locks make sure only
+    one worker refreshes a key at a time.
+    """
+
+    @abc.abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abc.abstractmethod
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        ...
+
+    @abc.abstractmethod
+    async def append(self, key: str, record: bytes):
+        ...
+
+    @abc.abstractmethod
+    async def read_log(self, key: str, start: int) -> Tuple[List[bytes], int]:
+        """Read log records from a position; returns them and the next position.
+
+        Raises LogCompacted when records from start on are no longer kept.
+        """
+
+    @abc.abstractmethod
+    async def compact_log(self, key: str, snapshot: bytes, position: int):
+        """Replace the records before a position with a snapshot of the state they built"""
+
+    @abc.abstractmethod
+    async def read_snapshot(self, key: str) -> Optional[Tuple[bytes, int]]:
+        """The latest log snapshot and the position it covers, if any"""
+
+    @abc.abstractmethod
+    async def acquire_refresh_lock(self, key: str, ttl: float) -> bool:
+        """Try to become the one worker refreshing a key, without waiting"""
+
+    @abc.abstractmethod
+    async def release_refresh_lock(self, key: str):
+        ...
+
+    async def close(self):
+        pass
+
+class FileSharedCache(SharedCache):
+    """Shared cache in a local directory, for workers on one host.
+
+    Values and snapshots are replaced atomically with os.replace, logs are
+    newline separated records appended to a file that compaction rewrites
+    to its tail, and refresh locks are flock locks, which the OS releases
+    if the worker dies. Files of keys untouched for max_age are swept.
+    Disk I/O runs in a thread so it does not block the event loop.
+    """
+
+    SWEEP_INTERVAL = 600
+
+    def __init__(self, directory: str, max_age: float = 24 * 3600):
+        self.directory = directory
+        self.max_age = max_age
+        os.makedirs(directory, exist_ok=True)
+        self._locks: Dict[str, int] = {}
+        self._last_sweep = time.monotonic()
+
+    def _path(self, key: str, suffix: str) -> str:
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{digest}.{suffix}")
+
+    def _read_file(self, path: str) -> Optional[bytes]:
+        try:
+            with open(path, "rb") as value_file:
+                return value_file.read()
+        except FileNotFoundError:
+            return None
+
+    def _write_file(self, path: str, data: bytes):
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as value_file:
+                value_file.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await asyncio.to_thread(self._read_file, self._path(key, "val"))
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        await asyncio.to_thread(self._write_file, self._path(key, "val"), value)
+        await self._maybe_sweep()
+
+    def _append(self, path: str, record: bytes):
+        # Records are single-line JSON, so a newline separates them
+        try:
+            with open(path, "xb") as log_file:
+                log_file.write(_pack_position(0, record + b"\n"))
+        except FileExistsError:
+            with open(path, "ab") as log_file:
+                log_file.write(record + b"\n")
+
+    async def append(self, key: str, record: bytes):
+        await asyncio.to_thread(self._append, self._path(key, "log"), record)
+        await self._maybe_sweep()
+
+    def _read_log(self, path: str, start: int) -> Tuple[List[bytes], int]:
+        try:
+            with open(path, "rb") as log_file:
+                header = _unpack_position(log_file.read(POSITION_HEADER))
+                if header is None:
+                    return [], start
+                base = header[1]
+                log_file.seek(0, os.SEEK_END)
+                log_end = base + log_file.tell() - POSITION_HEADER
+                # Before the start, or past the end of a log that was recreated
+                if start < base or start > log_end:
+                    raise LogCompacted(base)
+                log_file.seek(POSITION_HEADER + start - base)
+                chunk = log_file.read()
+        except FileNotFoundError:
+            return [], start
+
+        # Only consume complete records; a partial last line is read next time
+        end = chunk.rfind(b"\n") + 1
+        records = [line for line in chunk[:end].split(b"\n") if line]
+        return records, start + end
+
+    async def read_log(self, key: str, start: int) -> Tuple[List[bytes], int]:
+        return await asyncio.to_thread(self._read_log, self._path(key, "log"), start)
+
+    def _compact_log(self, key: str, snapshot: bytes, position: int):
+        # The snapshot goes first, so a reader sent to it never finds it
+        # older than the log's start
+        self._write_file(self._path(key, "snap"), _pack_position(position, snapshot))
+
+        path = self._path(key, "log")
+        data = self._read_file(path)
+        header = _unpack_position(data) if data is not None else None
+        if header is None:
+            return
+        records, base = header
+        if position > base:
+            self._write_file(path, _pack_position(position, records[position - base:]))
+
+    async def compact_log(self, key: str, snapshot: bytes, position: int):
+        await asyncio.to_thread(self._compact_log, key, snapshot, position)
+
+    async def read_snapshot(self, key: str) -> Optional[Tuple[bytes, int]]:
+        data = await asyncio.to_thread(self._read_file, self._path(key, "snap"))
+        return _unpack_position(data) if data is not None else None
+
+    def _lock(self, path: str) -> Optional[int]:
+        fd = os.open(path, os.O_CREAT | os.O_RDWR)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return None
+        return fd
+
+    def _unlock(self, fd: int):
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+    async def acquire_refresh_lock(self, key: str, ttl: float) -> bool:
+        if key in self._locks:
+            return False
+
+        fd = await asyncio.to_thread(self._lock, self._path(key, "lock"))
+        if fd is None:
+            return False
+        self._locks[key] = fd
+        return True
+
+    async def release_refresh_lock(self, key: str):
+        fd = self._locks.pop(key, None)
+        if fd is not None:
+            await asyncio.to_thread(self._unlock, fd)
+
+    async def _maybe_sweep(self):
+        if time.monotonic() - self._last_sweep < self.SWEEP_INTERVAL:
+            return
+        self._last_sweep = time.monotonic()
+        try:
+            removed = await asyncio.to_thread(self._sweep)
+        except OSError as e:
+            logger.error(f"Shared cache sweep failed: {e}")
+            return
+        if removed:
+            logger.info(f"Swept {removed} expired shared cache files")
+
+    def _sweep(self) -> int:
+        """Remove the files of keys none of whose files changed within max_age"""
+        cutoff = time.time() - self.max_age
+        groups: Dict[str, List[os.DirEntry]] = {}
+        for entry in os.scandir(self.directory):
+            groups.setdefault(entry.name.split(".", 1)[0], []).append(entry)
+
+        removed = 0
+        for entries in groups.values():
+            try:
+                if any(entry.stat().st_mtime >= cutoff for entry in entries):
+                    continue
+            except FileNotFoundError:
+                continue
+
+            # Hold the key's lock while removing its files, and leave keys
+            # some worker is refreshing alone
+            lock_fd = None
+            lock_entry = next((entry for entry in entries if entry.name.endswith(".lock")), None)
+            if lock_entry is not None:
+                lock_fd = self._lock(lock_entry.path)
+                if lock_fd is None:
+                    continue
+            try:
+                for entry in entries:
+                    try:
+                        os.unlink(entry.path)
+                        removed += 1
+                    except FileNotFoundError:
+                        pass
+            finally:
+                if lock_fd is not None:
+                    self._unlock(lock_fd)
+        return removed
+
+    async def close(self):
+        for key in list(self._locks):
+            await self.release_refresh_lock(key)
+
+class RedisSharedCache(SharedCache):
+    """Shared cache on a Redis-compatible async client (e.g. redis.asyncio.Redis).
+
+    A log is a list plus a base key holding the position of its first
+    record; compaction trims the list and moves the base in one script,
+    so positions stay valid across compactions.
+    """
+
+    # Delete the lock only if it is still ours; a lock that expired and
+    # was taken by another worker is left alone
+    RELEASE_SCRIPT = "if redis.call('get',KEYS[1])==ARGV[1] then return redis.call('del',KEYS[1]) end"
+
+    # Returns {base} when start is outside the log, else {base, records}
+    READ_LOG_SCRIPT = """
+local base = tonumber(redis.call('get', KEYS[2]) or '0')
+local start = tonumber(ARGV[1])
+if start < base or start > base + redis.call('llen', KEYS[1]) then
+  return {base}
+end
+return {base, redis.call('lrange', KEYS[1], start - base, -1)}
+"""
+
+    COMPACT_LOG_SCRIPT = """
+local base = tonumber(redis.call('get', KEYS[2]) or '0')
+local position = tonumber(ARGV[2])
+redis.call('set', KEYS[3], ARGV[1], 'EX', ARGV[3])
+if position > base then
+  redis.call('ltrim', KEYS[1], position - base, -1)
+  redis.call('set', KEYS[2], position, 'EX', ARGV[3])
+end
+"""
+
+    def __init__(self, client, prefix: str = "f1:", log_ttl: int = 24 * 3600):
+        self.client = client
+        self.prefix = prefix
+        self.log_ttl = log_ttl
+        self._lock_tokens: Dict[str, str] = {}
+
+    def _log_keys(self, key: str) -> List[str]:
+        """The list, base and snapshot keys of a log"""
+        return [self.prefix + part + key for part in ("log:", "logbase:", "snapshot:")]
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(self.prefix + key)
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        expires = int(ttl) if ttl and ttl != float("inf") else None
+        await self.client.set(self.prefix + key, value, ex=expires)
+
+    async def append(self, key: str, record: bytes):
+        log_keys = self._log_keys(key)
+        await self.client.rpush(log_keys[0], record)
+        # The base and snapshot expire with the log they belong to
+        for log_key in log_keys:
+            await self.client.expire(log_key, self.log_ttl)
+
+    async def read_log(self, key: str, start: int) -> Tuple[List[bytes], int]:
+        result = await self.client.eval(self.READ_LOG_SCRIPT, 2, *self._log_keys(key)[:2], start)
+        base = int(result[0])
+        if len(result) == 1:
+            raise LogCompacted(base)
+        records = list(result[1])
+        return records, start + len(records)
+
+    async def compact_log(self, key: str, snapshot: bytes, position: int):
+        await self.client.eval(
+            self.COMPACT_LOG_SCRIPT, 3, *self._log_keys(key),
+            _pack_position(position, snapshot), position, self.log_ttl,
+        )
+
+    async def read_snapshot(self, key: str) -> Optional[Tuple[bytes, int]]:
+        data = await self.client.get(self._log_keys(key)[2])
+        return _unpack_position(data) if data is not None else None
+
+    async def acquire_refresh_lock(self, key: str, ttl: float) -> bool:
+        token = uuid.uuid4().hex
+        acquired = await self.client.set(self.prefix + "lock:" + key, token, nx=True, px=int(ttl * 1000))
+        if acquired:
+            self._lock_tokens[key] = token
+        return bool(acquired)
+
+    async def release_refresh_lock(self, key: str):
+        token = self._lock_tokens.pop(key, None)
+        if token is not None:
+            await self.client.eval(self.RELEASE_SCRIPT, 1, self.prefix + "lock:" + key, token)
+
+    async def close(self):
+        close = getattr(self.client, "aclose", None) or getattr(self.client, "close", None)
+        if close:
+            await close()
+
+def create_shared_cache_from_env() -> Optional[SharedCache]:
+    """Build the shared cache configured by F1_SHARED_CACHE_DIR or F1_SHARED_CACHE_REDIS_URL"""
+    redis_url = os.getenv("F1_SHARED_CACHE_REDIS_URL")
+    if redis_url:
+        try:
+            import redis.asyncio as redis_asyncio
+        except ImportError:
+            logger.error("F1_SHARED_CACHE_REDIS_URL is set but the redis package is not installed")
+            return None
+        logger.info("Using Redis shared cache")
+        return RedisSharedCache(redis_asyncio.from_url(redis_url))
+
+    directory = os.getenv("F1_SHARED_CACHE_DIR")
+    if directory:
+        logger.info(f"Using file shared cache in {directory}")
+        return FileSharedCache(directory)
+
+    return None
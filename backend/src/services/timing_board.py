@@ -0,0 +1,160 @@
+"""
+Timing Board - Live timing entries updated incrementally from new dataset rows
+"""
+
+import bisect
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from src.services.sector_tracker import SectorTracker
+
+# Endpoints the board consumes, and the field that makes a row the latest for its driver
+BOARD_ENDPOINTS: Dict[str, str] = {
+    'position': 'date',
+    'intervals': 'date',
+    'laps': 'lap_number',
+    'stints': 'stint_number',
+}
+
+# Pit stops are counted rather than tracked by latest row
+PIT_ENDPOINT = 'pit'
+
+# Every lap counts towards best lap and sector times
+LAPS_ENDPOINT = 'laps'
+
+# Builds one timing entry from a driver, their latest rows, pit stop count and sector states
+EntryBuilder = Callable[[Dict, Optional[Dict], Optional[Dict], Optional[Dict], Optional[Dict], int, Dict], Dict]
+
+def _order(value: Any) -> Tuple:
+    return (value is not None, value if value is not None else 0)
+
+class TimingBoard:
+    """Timing entries for one session, kept sorted by position.
+
+    Datasets push their new or changed rows to apply(); only the drivers
+    those rows belong to are rebuilt and re-sorted. version increases
+    whenever an entry changes, so readers can tell when nothing did.
+    """
+
+    def __init__(self, build_entry: EntryBuilder):
+        self.build_entry = build_entry
+        self.version = 0
+        self.rows_applied = 0
+        self.entries_rebuilt = 0
+
+        self._drivers: List[Dict] = []
+        self._slots: Dict[Any, int] = {}  # driver_number -> position in the drivers list
+        self._latest: Dict[str, Dict[Any, Dict]] = {endpoint: {} for endpoint in BOARD_ENDPOINTS}
+        self._pit_stops: Dict[Any, Set[Any]] = {}
+        self.sectors = SectorTracker()
+
+        self._entries: Dict[Any, Dict] = {}
+        self._order: List[Tuple[Tuple, Any]] = []  # (sort key, driver_number) by position
+        self._sort_keys: Dict[Any, Tuple] = {}
+        self._snapshot: Optional[Tuple[int, List[Dict]]] = None
+        self._attached: List[Any] = []
+
+    def attach(self, datasets: Dict[str, Any]):
+        """Load the latest state of each dataset, then follow its merges"""
+        for endpoint, dataset in datasets.items():
+            index = dataset.driver_index()
+            if endpoint in (PIT_ENDPOINT, LAPS_ENDPOINT):
+                rows = [row for driver_number in index.drivers() for row in index.rows(driver_number)]
+            else:
+                rows = [index.latest(driver_number) for driver_number in index.drivers()]
+            self.apply(endpoint, rows)
+            dataset.add_listener(self.apply)
+            self._attached.append(dataset)
+
+    def detach(self):
+        """Stop following the datasets"""
+        for dataset in self._attached:
+            dataset.remove_listener(self.apply)
+        self._attached = []
+
+    def is_attached_to(self, datasets: Dict[str, Any]) -> bool:
+        return len(self._attached) == len(datasets) and all(
+            dataset in self._attached for dataset in datasets.values()
+        )
+
+    def set_drivers(self, drivers: List[Dict]):
+        """Set the session's drivers, rebuilding entries only when they changed"""
+        if drivers == self._drivers:
+            return
+        self._drivers = list(drivers)
+        self._slots = {driver.get('driver_number'): slot for slot, driver in enumerate(self._drivers)}
+        self._entries = {}
+        self._order = []
+        self._sort_keys = {}
+        for driver in self._drivers:
+            self._rebuild(driver.get('driver_number'))
+        self.version += 1
+
+    def apply(self, endpoint: str, rows: List[Dict]):
+        """Consume new or changed rows of an endpoint"""
+        touched = set()
+        if endpoint == PIT_ENDPOINT:
+            for row in rows:
+                driver_number = row.get('driver_number')
+                stops = self._pit_stops.setdefault(driver_number, set())
+                if row.get('lap_number') not in stops:
+                    stops.add(row.get('lap_number'))
+                    touched.add(driver_number)
+        elif endpoint in BOARD_ENDPOINTS:
+            order_field = BOARD_ENDPOINTS[endpoint]
+            latest = self._latest[endpoint]
+            for row in rows:
+                driver_number = row.get('driver_number')
+                current = latest.get(driver_number)
+                if current is None or _order(row.get(order_field)) >= _order(current.get(order_field)):
+                    latest[driver_number] = row
+                    touched.add(driver_number)
+            if endpoint == LAPS_ENDPOINT:
+                touched |= self.sectors.apply(rows)
+        self.rows_applied += len(rows)
+
+        changed = False
+        for driver_number in touched:
+            if driver_number in self._slots and self._rebuild(driver_number):
+                changed = True
+        if changed:
+            self.version += 1
+
+    def _rebuild(self, driver_number: Any) -> bool:
+        """Rebuild one driver's entry and move it to its place; returns whether it changed"""
+        entry = self.build_entry(
+            self._drivers[self._slots[driver_number]],
+            self._latest['position'].get(driver_number),
+            self._latest['intervals'].get(driver_number),
+            self._latest['laps'].get(driver_number),
+            self._latest['stints'].get(driver_number),
+            len(self._pit_stops.get(driver_number, ())),
+            self.sectors.state(driver_number, self._latest['laps'].get(driver_number)),
+        )
+        self.entries_rebuilt += 1
+        if self._entries.get(driver_number) == entry:
+            return False
+        self._entries[driver_number] = entry
+
+        # Unknown positions go last, in the order of the drivers list
+        sort_key = (entry.get('position') or 999, self._slots[driver_number])
+        previous = self._sort_keys.get(driver_number)
+        if previous != sort_key:
+            if previous is not None:
+                del self._order[bisect.bisect_left(self._order, (previous, driver_number))]
+            bisect.insort(self._order, (sort_key, driver_number))
+            self._sort_keys[driver_number] = sort_key
+        return True
+
+    def driver_timings(self) -> List[Dict]:
+        """Entries sorted by position; the same list until the version changes"""
+        if self._snapshot is None or self._snapshot[0] != self.version:
+            self._snapshot = (self.version, [self._entries[driver_number] for _, driver_number in self._order])
+        return self._snapshot[1]
+
+    def stats(self) -> Dict:
+        return {
+            'version': self.version,
+            'drivers': len(self._entries),
+            'rows_applied': self.rows_applied,
+            'entries_rebuilt': self.entries_rebuilt,
+        }
@@ -0,0 +1,27 @@
+"""
+Helpers - Shared utilities for OpenF1 data
+"""
+
+from datetime import datetime, timezone
+from typing import Optional
+
+def parse_api_datetime(value: Optional[str]) -> Optional[datetime]:
+    """Parse an OpenF1 ISO timestamp into a timezone-aware UTC datetime"""
+    if not value:
+        return None
+
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+    # Timestamps without an offset are UTC
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+def format_api_datetime(value: datetime) -> str:
+    """Format a datetime the way OpenF1 date filters expect (UTC, Z suffix)"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat() + "Z"
@@ -0,0 +1,88 @@
+"""
+JSON Stream - Incremental decoding of JSON arrays fed in chunks
+"""
+
+import codecs
+import json
+from typing import Any, List
+
+# Same whitespace definition the json module uses
+WHITESPACE = json.decoder.WHITESPACE
+
+class JsonArrayStreamDecoder:
+    """Decode a top-level JSON array of objects as its bytes arrive.
+
+    Each feed() parses only the rows completed by that chunk, so the work
+    per call is bounded by the chunk size rather than the whole payload.
+    A body that is not an array is buffered and decoded by close().
+    """
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self._buffer = ''
+        self._pos = 0
+        self._started = False
+        self._finished = False
+        self._not_array = False
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        """Add a chunk of the body and return the rows it completed"""
+        self._buffer = self._buffer[self._pos:] + self._text_decoder.decode(chunk)
+        self._pos = 0
+        if self._not_array or self._finished:
+            return []
+        return self._drain()
+
+    def _drain(self) -> List[Any]:
+        """Decode every complete row currently buffered"""
+        rows = []
+        buffer = self._buffer
+        pos = self._pos
+
+        while True:
+            pos = WHITESPACE.match(buffer, pos).end()
+            if pos >= len(buffer):
+                break
+
+            char = buffer[pos]
+            if not self._started:
+                if char != '[':
+                    self._not_array = True
+                    break
+                self._started = True
+                pos += 1
+            elif char == ']':
+                self._finished = True
+                pos += 1
+                break
+            elif char == ',':
+                pos += 1
+            else:
+                try:
+                    row, pos = self._decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    # Row is not complete yet; wait for the next chunk
+                    break
+                rows.append(row)
+
+        self._pos = pos
+        return rows
+
+    def close(self) -> List[Any]:
+        """Finish decoding; returns any remaining rows"""
+        self._buffer = self._buffer[self._pos:] + self._text_decoder.decode(b'', final=True)
+        self._pos = 0
+
+        if self._not_array:
+            data = json.loads(self._buffer)
+            if not isinstance(data, list):
+                data = [data] if data else []
+            return data
+
+        rows = self._drain() if not self._finished else []
+        if not self._finished:
+            if not self._started and not self._buffer.strip():
+                return rows
+            raise ValueError("Truncated JSON array in response body")
+        return rows
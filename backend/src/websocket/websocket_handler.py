@@ -15,6 +15,11 @@ class WebSocketManager:
         self.active_connections: List[WebSocket] = []
         self.connection_data: Dict[WebSocket, Dict] = {}
 
+        # Sends started but not finished per connection; grows when a client reads slowly
+        self.pending_sends: Dict[WebSocket, int] = {}
+        self.messages_sent = 0
+        self.send_failures = 0
+
     async def connect(self, websocket: WebSocket):
         """Accept new WebSocket connection"""
         await websocket.accept()
@@ -31,6 +36,7 @@ class WebSocketManager:
             self.active_connections.remove(websocket)
         if websocket in self.connection_data:
             del self.connection_data[websocket]
+        self.pending_sends.pop(websocket, None)
         logger.info(f"WebSocket connection closed. Total connections: {len(self.active_connections)}")
 
     async def disconnect_all(self):
@@ -45,7 +51,7 @@ class WebSocketManager:
     async def send_personal_message(self, message: Dict[str, Any], websocket: WebSocket):
         """Send message to specific WebSocket connection"""
         try:
-            await websocket.send_text(json.dumps(message))
+            await self._send(websocket, json.dumps(message))
         except Exception as e:
             logger.error(f"Error sending personal message: {e}")
             self.disconnect(websocket)
@@ -66,11 +72,24 @@ class WebSocketManager:
     async def _send_safe(self, websocket: WebSocket, message: Dict[str, Any]):
         """Safely send message to WebSocket, handle disconnections"""
         try:
-            await websocket.send_text(json.dumps(message))
+            await self._send(websocket, json.dumps(message))
         except Exception as e:
             logger.error(f"Error broadcasting to WebSocket: {e}")
             self.disconnect(websocket)
 
+    async def _send(self, websocket: WebSocket, text: str):
+        """Send text, counting it as queued until the send completes"""
+        self.pending_sends[websocket] = self.pending_sends.get(websocket, 0) + 1
+        try:
+            await websocket.send_text(text)
+            self.messages_sent += 1
+        except Exception:
+            self.send_failures += 1
+            raise
+        finally:
+            if websocket in self.pending_sends:
+                self.pending_sends[websocket] -= 1
+
     async def broadcast_to_subscribed(self, message: Dict[str, Any], data_type: str):
         """Broadcast message only to clients subscribed to specific data type"""
         if not self.active_connections:
@@ -94,6 +113,19 @@ class WebSocketManager:
         """Get number of active connections"""
         return len(self.active_connections)
 
+    def collect_metrics(self) -> List[tuple]:
+        """Report connections and send queue depths for /metrics"""
+        depths = list(self.pending_sends.values())
+        return [
+            ('f1_websocket_connections', 'gauge', 'Open WebSocket connections', [({}, self.connection_count())]),
+            ('f1_websocket_send_queue_depth', 'gauge', 'Sends in progress across all WebSocket connections',
+             [({}, sum(depths))]),
+            ('f1_websocket_send_queue_depth_max', 'gauge', 'Sends in progress on the most backed-up connection',
+             [({}, max(depths, default=0))]),
+            ('f1_websocket_messages_sent_total', 'counter', 'WebSocket messages sent', [({}, self.messages_sent)]),
+            ('f1_websocket_send_failures_total', 'counter', 'WebSocket sends that failed', [({}, self.send_failures)]),
+        ]
+
     def update_subscription(self, websocket: WebSocket, data_types: List[str], action: str = "subscribe"):
         """Update client subscriptions"""
         if websocket not in self.connection_data:
@@ -50,6 +50,7 @@ def main():
         ("/api/live-timing/latest", "Live timing data"),
         ("/api/positions/latest", "Driver positions"),
         ("/api/locations/latest", "Car locations"),
+        ("/api/laps/latest", "Lap history and statistics"),
         ("/api/pit-stops/latest", "Pit stop data"),
         ("/api/circuit/latest", "Circuit data"),
     ]
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Checks that the mock OpenF1 server filters fixtures with every comparison
+operator, in both the raw (`lap_number<3`) and encoded (`lap_number=<3`)
+query forms.
+"""
+
+import asyncio
+import sys
+from typing import List
+
+import aiohttp
+
+from mock_openf1.fixtures import SessionFixture, generate_race
+from mock_openf1.server import MockOpenF1, start_server
+
+PORT = 8791
+
+# (raw query, encoded query, lap numbers of driver 1 it selects out of 1..6)
+OPERATOR_CASES = [
+    ("lap_number=3", "lap_number=3", [3]),
+    ("lap_number>=3", "lap_number=>=3", [3, 4, 5, 6]),
+    ("lap_number<=3", "lap_number=<=3", [1, 2, 3]),
+    ("lap_number>3", "lap_number=>3", [4, 5, 6]),
+    ("lap_number<3", "lap_number=<3", [1, 2]),
+]
+
+# Date filters on lap starts; laps of the generated race are ~90s apart
+DATE_CASES = [
+    (">", lambda start, lap_start: lap_start > start),
+    (">=", lambda start, lap_start: lap_start >= start),
+    ("<", lambda start, lap_start: lap_start < start),
+    ("<=", lambda start, lap_start: lap_start <= start),
+]
+
+async def _lap_numbers(client: aiohttp.ClientSession, query: str) -> List[int]:
+    url = f"http://127.0.0.1:{PORT}/v1/laps?session_key=9999&driver_number=1&{query}"
+    async with client.get(url) as response:
+        assert response.status == 200, response.status
+        return [row["lap_number"] for row in await response.json()]
+
+async def check_filters():
+    race = generate_race(laps=6, drivers=2)
+    runner = await start_server(MockOpenF1(SessionFixture(race)), port=PORT)
+    try:
+        async with aiohttp.ClientSession() as client:
+            for raw, encoded, expected in OPERATOR_CASES:
+                assert await _lap_numbers(client, raw) == expected, raw
+                assert await _lap_numbers(client, encoded) == expected, encoded
+
+            laps = [lap for lap in race["laps"] if lap["driver_number"] == 1]
+            start = laps[2]["date_start"]
+            for op, selects in DATE_CASES:
+                expected = [lap["lap_number"] for lap in laps if selects(start, lap["date_start"])]
+                # Dates carry a "+", which a raw query would turn into a space
+                quoted_start = start.replace("+", "%2B")
+                assert await _lap_numbers(client, f"date_start{op}{quoted_start}") == expected, op
+                assert await _lap_numbers(client, f"date_start={op}{quoted_start}") == expected, op
+    finally:
+        await runner.cleanup()
+
+def test_filters():
+    asyncio.run(check_filters())
+
+def main():
+    print("🏎️  Mock OpenF1 Filter Test")
+    print("=" * 50)
+    try:
+        test_filters()
+    except AssertionError as e:
+        print(f"  ❌ Filters: {e!r}")
+        return 1
+    print("  ✅ Filters (=, >=, <=, >, <)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Checks for the shared cache backends: refresh locks, log positions across
+compaction, and dataset replay between workers. Redis is exercised through
+LocalRedis, an in-memory stand-in, so no server is needed.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from src.services.f1_service import F1Service
+from src.services.shared_cache import FileSharedCache, LogCompacted, RedisSharedCache
+from src.services.session_datasets import ColumnarDataset, SlidingWindowBuffer
+
+class LocalRedis:
+    """The subset of redis.asyncio.Redis the shared cache uses, in memory.
+
+    eval() runs Python equivalents of the RedisSharedCache scripts, so
+    what is tested is the client's key layout and position arithmetic.
+    """
+
+    def __init__(self):
+        self.values: Dict[str, object] = {}
+        self.expires: Dict[str, float] = {}
+        self.scripts = {
+            RedisSharedCache.RELEASE_SCRIPT: self._release,
+            RedisSharedCache.READ_LOG_SCRIPT: self._read_log,
+            RedisSharedCache.COMPACT_LOG_SCRIPT: self._compact_log,
+        }
+
+    def _encode(self, value) -> bytes:
+        if isinstance(value, bytes):
+            return value
+        return str(value).encode("utf-8")
+
+    def _live(self, key: str):
+        if key in self.expires and self.expires[key] <= time.time():
+            self.values.pop(key, None)
+            self.expires.pop(key, None)
+        return self.values.get(key)
+
+    def _set(self, key: str, value, ex: Optional[float] = None):
+        self.values[key] = self._encode(value)
+        self.expires.pop(key, None)
+        if ex:
+            self.expires[key] = time.time() + float(ex)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._live(key)
+
+    async def set(self, key: str, value, ex=None, px=None, nx=False):
+        if nx and self._live(key) is not None:
+            return None
+        self._set(key, value, ex if ex else (px / 1000 if px else None))
+        return True
+
+    async def delete(self, key: str) -> int:
+        existed = self._live(key) is not None
+        self.values.pop(key, None)
+        self.expires.pop(key, None)
+        return int(existed)
+
+    async def expire(self, key: str, seconds: int) -> bool:
+        if self._live(key) is None:
+            return False
+        self.expires[key] = time.time() + seconds
+        return True
+
+    async def rpush(self, key: str, value) -> int:
+        items = self._live(key)
+        if items is None:
+            items = self.values[key] = []
+        items.append(self._encode(value))
+        return len(items)
+
+    async def lrange(self, key: str, start: int, end: int) -> List[bytes]:
+        items = self._live(key) or []
+        return items[start:] if end == -1 else items[start:end + 1]
+
+    async def llen(self, key: str) -> int:
+        return len(self._live(key) or [])
+
+    async def ltrim(self, key: str, start: int, end: int):
+        items = self._live(key)
+        if items is not None:
+            self.values[key] = items[start:] if end == -1 else items[start:end + 1]
+
+    async def eval(self, script: str, numkeys: int, *args):
+        return await self.scripts[script](list(args[:numkeys]), list(args[numkeys:]))
+
+    async def aclose(self):
+        pass
+
+    async def _release(self, keys, argv):
+        if await self.get(keys[0]) == self._encode(argv[0]):
+            return await self.delete(keys[0])
+        return None
+
+    async def _read_log(self, keys, argv):
+        base = int(self._live(keys[1]) or 0)
+        start = int(argv[0])
+        if start < base or start > base + await self.llen(keys[0]):
+            return [base]
+        return [base, await self.lrange(keys[0], start - base, -1)]
+
+    async def _compact_log(self, keys, argv):
+        base = int(self._live(keys[1]) or 0)
+        position = int(argv[1])
+        self._set(keys[2], argv[0], argv[2])
+        if position > base:
+            await self.ltrim(keys[0], position - base, -1)
+            self._set(keys[1], position, argv[2])
+
+async def check_refresh_lock(new_cache):
+    worker_a, worker_b = new_cache(), new_cache()
+    assert await worker_a.acquire_refresh_lock("sync:laps", 30)
+    assert not await worker_b.acquire_refresh_lock("sync:laps", 30)
+    assert not await worker_a.acquire_refresh_lock("sync:laps", 30)
+    await worker_a.release_refresh_lock("sync:laps")
+    assert await worker_b.acquire_refresh_lock("sync:laps", 30)
+    await worker_b.release_refresh_lock("sync:laps")
+
+async def check_expired_lock_is_not_released(new_cache):
+    worker_a, worker_b = new_cache(), new_cache()
+    assert await worker_a.acquire_refresh_lock("sync:pit", 0.05)
+    await asyncio.sleep(0.1)
+    # A's lock expired and B took it; A's late release must leave B's lock alone
+    assert await worker_b.acquire_refresh_lock("sync:pit", 30)
+    await worker_a.release_refresh_lock("sync:pit")
+    assert not await new_cache().acquire_refresh_lock("sync:pit", 30)
+    await worker_b.release_refresh_lock("sync:pit")
+
+async def check_log_positions(new_cache):
+    cache = new_cache()
+    records = [json.dumps({"n": n}).encode("utf-8") for n in range(5)]
+    for record in records[:3]:
+        await cache.append("log", record)
+
+    read, position = await cache.read_log("log", 0)
+    assert read == records[:3]
+    assert await cache.read_log("log", position) == ([], position)
+
+    # Compact after the first two records (positions are bytes in files,
+    # record counts in Redis); positions keep their meaning
+    first_two = sum(len(record) + 1 if isinstance(cache, FileSharedCache) else 1 for record in records[:2])
+    await cache.compact_log("log", b"snapshot", first_two)
+    await cache.append("log", records[3])
+
+    read, end = await cache.read_log("log", first_two)
+    assert read == records[2:4], read
+    assert await cache.read_log("log", position) == ([records[3]], end)
+    try:
+        await cache.read_log("log", 0)
+        raise AssertionError("read before the compacted start")
+    except LogCompacted as compacted:
+        assert compacted.start == first_two
+    assert await cache.read_snapshot("log") == (b"snapshot", first_two)
+    assert await cache.read_snapshot("other") is None
+
+def _batches(rows: List[Dict], size: int) -> List[List[Dict]]:
+    return [rows[start:start + size] for start in range(0, len(rows), size)]
+
+def _pit_rows() -> List[Dict]:
+    return [
+        {"session_key": 9999, "driver_number": driver, "lap_number": lap,
+         "date": f"2024-03-02T15:{lap:02d}:{driver:02d}+00:00", "pit_duration": 20.0 + driver / 10}
+        for lap in range(1, 31) for driver in (1, 11, 16, 44)
+    ]
+
+def _position_rows() -> List[Dict]:
+    # Far more rows than the 5s re-fetch overlap, so columnar datasets
+    # forget the de-duplication keys of most of them
+    return [
+        {"session_key": 9999, "meeting_key": 1999, "driver_number": driver,
+         "date": time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime(1709391600 + step * 4)),
+         "position": place}
+        for step in range(120) for place, driver in enumerate((1, 11, 16, 44), start=1)
+    ]
+
+async def check_replay(new_cache):
+    for endpoint, make_rows, key_fields in (
+        ("pit", _pit_rows, ("driver_number", "lap_number")),
+        ("position", _position_rows, ("driver_number", "date")),
+    ):
+        await _check_replay(new_cache, endpoint, make_rows(), key_fields)
+
+async def _check_replay(new_cache, endpoint: str, rows: List[Dict], key_fields):
+    service_a, service_b, service_c = (F1Service(shared_cache=new_cache()) for _ in range(3))
+    log_key = f"dataset:{endpoint}:9999"
+    # Each worker's own store, so position gets a ColumnarDataset like in production
+    writer, early, late = (service.datasets.get("9999", endpoint) for service in (service_a, service_c, service_b))
+    assert isinstance(writer, ColumnarDataset) == (endpoint == "position")
+    batches = _batches(rows, len(rows) // 15)
+
+    for count, batch in enumerate(batches, start=1):
+        record = json.dumps({"fetched_at": time.time(), "rows": batch}).encode("utf-8")
+        await service_a.shared_cache.append(log_key, record)
+        await service_a._replay_shared_log(writer, log_key)
+        if count == 5:
+            await service_c._replay_shared_log(early, log_key)
+        if count in (6, 12):
+            await service_a._compact_shared_log(writer, log_key)
+
+    # A late worker restores the snapshot and the tail; an early one
+    # whose position was compacted away recovers the same way
+    await service_b._replay_shared_log(late, log_key)
+    await service_c._replay_shared_log(early, log_key)
+    key = lambda row: tuple(row[field] for field in key_fields)
+    for dataset in (writer, late, early):
+        assert dataset.row_count() == len(rows), (endpoint, dataset.row_count(), len(rows))
+        assert sorted(dataset.rows, key=key) == sorted(rows, key=key), endpoint
+        assert dataset.age() is not None
+    assert service_a.shared_compactions == 2
+    assert late.log_position == writer.log_position == early.log_position
+
+async def check_windowed_replay(new_cache):
+    service_a, service_b = F1Service(shared_cache=new_cache()), F1Service(shared_cache=new_cache())
+    log_key = "dataset:location:9999"
+    now = time.time()
+    rows = [
+        {"session_key": 9999, "driver_number": driver, "x": step, "y": 0, "z": 0,
+         "date": time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime(now - 20 + step))}
+        for step in range(20) for driver in (1, 44)
+    ]
+    writer, late = SlidingWindowBuffer("location"), SlidingWindowBuffer("location")
+    for batch in _batches(rows, 10):
+        record = json.dumps({"fetched_at": time.time(), "rows": batch}).encode("utf-8")
+        await service_a.shared_cache.append(log_key, record)
+        await service_a._replay_shared_log(writer, log_key)
+    await service_a._compact_shared_log(writer, log_key)
+    await service_b._replay_shared_log(late, log_key)
+    assert late.rows == writer.rows and late.row_count() > 0
+
+async def check_sweep(new_cache):
+    cache, other = new_cache(), new_cache()
+    await cache.set("stale", b"value")
+    await cache.set("fresh", b"value")
+    await cache.append("held", b"{}")
+    assert await other.acquire_refresh_lock("held", 30)
+
+    # Age everything but "fresh" past max_age
+    old = time.time() - cache.max_age - 60
+    for path in (cache._path("stale", "val"), cache._path("held", "log"), cache._path("held", "lock")):
+        os.utime(path, (old, old))
+    cache._last_sweep -= cache.SWEEP_INTERVAL
+    await cache.set("fresh", b"value")
+
+    assert await cache.get("stale") is None
+    assert await cache.get("fresh") == b"value"
+    assert await cache.read_log("held", 0) == ([b"{}"], 3)
+    await other.release_refresh_lock("held")
+
+CHECKS = [
+    check_refresh_lock,
+    check_expired_lock_is_not_released,
+    check_log_positions,
+    check_replay,
+    check_windowed_replay,
+]
+
+def test_redis_shared_cache():
+    for check in CHECKS:
+        redis = LocalRedis()
+        asyncio.run(check(lambda: RedisSharedCache(redis)))
+
+def test_file_shared_cache():
+    for check in CHECKS + [check_sweep]:
+        if check is check_expired_lock_is_not_released:
+            continue  # flock locks do not expire; the OS releases them with the process
+        with tempfile.TemporaryDirectory() as directory:
+            asyncio.run(check(lambda: FileSharedCache(directory)))
+
+def main():
+    print("🏎️  F1 Dashboard Shared Cache Test")
+    print("=" * 50)
+
+    failed = 0
+    for name, test in (("Redis (local stand-in)", test_redis_shared_cache), ("File", test_file_shared_cache)):
+        try:
+            test()
+            print(f"  ✅ {name} shared cache")
+        except AssertionError as e:
+            failed += 1
+            print(f"  ❌ {name} shared cache: {e!r}")
+    return failed
+
+if __name__ == "__main__":
+    sys.exit(1 if main() else 0)
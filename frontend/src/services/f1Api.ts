@@ -29,6 +29,9 @@ interface LiveTimingResponse {
   lastUpdate: string;
   sessionKey: string;
   totalDrivers?: number;
+  // Set from the X-Data-Age / X-Data-Stale response headers
+  dataAge?: number;
+  isStale?: boolean;
   error?: string;
 }
 
@@ -108,7 +111,7 @@ class F1ApiService {
 
         const data = await response.json();
         console.log(`[F1API] Success: ${url}`);
-        return data;
+        return this.withDataFreshness(data, response.headers);
 
       } catch (error) {
         console.warn(`[F1API] Attempt ${attempt}/${retries} failed for ${url}:`, error);
@@ -126,6 +129,22 @@ class F1ApiService {
     throw new Error('Unexpected error in makeRequest');
   }
 
+  /**
+   * Attach the age of the upstream data behind a response, which the
+   * backend reports per request in headers rather than in cached bodies
+   */
+  private withDataFreshness<T>(data: T, headers: Headers): T {
+    const age = headers.get('X-Data-Age');
+    if (age === null || !data || typeof data !== 'object' || Array.isArray(data)) {
+      return data;
+    }
+    return {
+      ...data,
+      dataAge: parseFloat(age),
+      isStale: headers.get('X-Data-Stale') === 'true'
+    };
+  }
+
   /**
    * Clear cache (useful for manual refresh)
    */
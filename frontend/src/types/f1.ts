@@ -154,8 +154,14 @@ export interface Driver {
     tyreCompound: string;
     tyreAge: number;
     pitStops: number;
+    lapStatus?: SectorStatus | null;
+    sectorStatus?: (SectorStatus | null)[];
+    miniSectors?: (SectorStatus | null)[][];
   }
   
+  // Keys of SECTOR_COLORS the backend reports for laps, sectors and mini-sectors
+  export type SectorStatus = 'SESSION_BEST' | 'PERSONAL_BEST' | 'SLOWER';
+  
   export interface CircuitPoint {
     x: number;
     y: number;